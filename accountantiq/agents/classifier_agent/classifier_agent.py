@@ -2,27 +2,51 @@
 Classifier Agent - Auto-codes new transactions using learned rules.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import math
+import os
 import time
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from accountantiq.core.database import Database
+from accountantiq.core.database import Database, open_database
 from accountantiq.core.models import ClassifierResult
 from rapidfuzz import fuzz, process
 
+FUZZY_MATCH_THRESHOLD = 85  # Minimum fuzz.ratio similarity (0-100)
+
+REVIEW_SUFFIX = " [NEEDS REVIEW]"  # Appended to low-confidence explanations
+
+# fuzz.ratio can reach the threshold only if the longer string is at most
+# (200 / threshold - 1) times the length of the shorter one
+FUZZY_MAX_LENGTH_RATIO = 200 / FUZZY_MATCH_THRESHOLD - 1
+
+# Below this many distinct vendors, thread start-up costs more than it saves
+PARALLEL_MATCH_MIN_VENDORS = 500
+
+# Rule sets at least this large get a pattern-length blocking index
+LENGTH_BLOCKING_MIN_RULES = 200
+
+# Batches with at least this many vendor x pattern pairs are scored with
+# process.cdist, in row blocks of at most CDIST_MAX_CELLS scores (8 bytes each)
+CDIST_MIN_CELLS = 10_000
+CDIST_MAX_CELLS = 4_000_000
+
 
 class ClassifierAgent:
     """Classifies new transactions using learned rules."""
 
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, db: Optional[Database] = None):
         """
         Initialize classifier agent.
 
         Args:
             workspace_path: Path to workspace
+            db: Open database to share (default: each call opens its own)
         """
         self.workspace_path = Path(workspace_path)
         self.db_path = self.workspace_path / "accountant.db"
+        self.db = db
 
     def run(self, confidence_threshold: float = 0.70) -> ClassifierResult:
         """
@@ -36,10 +60,9 @@ class ClassifierAgent:
         """
         start_time = time.time()
 
-        with Database(str(self.db_path)) as db:
+        with open_database(self.db_path, self.db) as db:
             # Get bank transactions that need coding
-            bank_txns = db.get_transactions(source="bank")
-            uncoded = [t for t in bank_txns if not t.get('nominal_code')]
+            uncoded = db.get_transactions(source="bank", coded=False)
 
             if not uncoded:
                 return ClassifierResult(
@@ -54,28 +77,67 @@ class ClassifierAgent:
                     duration_ms=int((time.time() - start_time) * 1000)
                 )
 
-            # Get rules
+            # Get rules and normalize their patterns once for batch matching
             rules = db.get_rules()
+            patterns = [self._normalize(r['vendor_pattern']) for r in rules]
+
+            # Exact-match index; rules arrive ordered by confidence, so the
+            # first rule seen for a pattern wins (same as the old linear scan)
+            exact_index = {}
+            for pattern, rule in zip(patterns, rules):
+                exact_index.setdefault(pattern, rule)
+
+            # Vendors longer than this cannot fuzzy-match any pattern
+            max_fuzzy_len = max(map(len, patterns), default=0) * FUZZY_MAX_LENGTH_RATIO
+
+            # Large rule sets: only score patterns whose length can reach the threshold
+            length_buckets = (
+                self._build_length_buckets(patterns)
+                if len(patterns) >= LENGTH_BLOCKING_MIN_RULES else None
+            )
 
             # Classify each transaction
             auto_coded = 0
             exceptions = 0
             confidences = []
+            auto_updates = []
+            exception_updates = []
+            rule_hits: Dict[int, int] = {}
 
-            for txn in uncoded:
-                match, confidence, explanation = self._match_transaction(
-                    txn, rules
-                )
+            # Match each distinct vendor once; repeat vendors reuse the result
+            vendor_keys = [self._normalize(t['vendor']) for t in uncoded]
+            unique_vendors = list(dict.fromkeys(vendor_keys))
+
+            # Reuse results persisted by earlier runs (dropped once any rule changes)
+            match_cache = self._load_cached_matches(db, unique_vendors, rules)
+            misses = [v for v in unique_vendors if v not in match_cache]
+            new_matches = self._match_vendors(
+                misses, exact_index, patterns, rules, max_fuzzy_len, length_buckets
+            )
+            match_cache.update(zip(misses, new_matches))
+            if rules:
+                db.upsert_match_cache([
+                    (vendor, match['id'] if match else None, confidence, explanation)
+                    for vendor, (match, confidence, explanation) in zip(misses, new_matches)
+                ])
+
+            # Explanation stored on low-confidence suggestions, built once per vendor
+            review_explanations = {
+                vendor: explanation + REVIEW_SUFFIX
+                for vendor, (match, _, explanation) in match_cache.items()
+                if match
+            }
+
+            for txn, vendor in zip(uncoded, vendor_keys):
+                match, confidence, explanation = match_cache[vendor]
 
                 if match and confidence >= confidence_threshold:
                     # Auto-code transaction
-                    db.update_transaction(txn['id'], {
-                        'nominal_code': match['nominal_code'],
-                        'confidence': confidence,
-                        'explanation': explanation,
-                        'assigned_by': 'classifier'
-                    })
-                    db.update_rule_stats(match['id'])
+                    auto_updates.append((
+                        match['nominal_code'], confidence, explanation,
+                        'classifier', txn['id']
+                    ))
+                    rule_hits[match['id']] = rule_hits.get(match['id'], 0) + 1
                     auto_coded += 1
                     confidences.append(confidence)
                 else:
@@ -83,14 +145,17 @@ class ClassifierAgent:
                     exceptions += 1
                     if match:
                         # Store low-confidence suggestion
-                        db.update_transaction(txn['id'], {
-                            'nominal_code': match['nominal_code'],
-                            'confidence': confidence,
-                            'explanation': explanation + " [NEEDS REVIEW]",
-                            'assigned_by': 'classifier'
-                        })
+                        exception_updates.append((
+                            match['nominal_code'], confidence,
+                            review_explanations[vendor], 'classifier', txn['id']
+                        ))
                         confidences.append(confidence)
 
+            # Flush coding results: one batch for auto-coded, one for exceptions
+            db.bulk_update_transaction_codes(auto_updates)
+            db.bulk_update_transaction_codes(exception_updates)
+            db.bulk_update_rule_stats(rule_hits)
+
             # Log action
             db.log_agent_action(
                 agent_name="classifier",
@@ -113,52 +178,243 @@ class ClassifierAgent:
                 next_step="reviewer" if exceptions > 0 else "exporter"
             )
 
-    def _match_transaction(
+    def _load_cached_matches(
         self,
-        transaction: dict,
+        db: Database,
+        vendors: List[str],
         rules: List[dict]
+    ) -> Dict[str, Tuple[Optional[dict], float, str]]:
+        """
+        Rebuild match tuples from the persistent classifier match cache.
+
+        Entries pointing at a rule that no longer exists are treated as misses.
+
+        Args:
+            db: Database connection
+            vendors: Distinct normalized vendors
+            rules: Current rules
+
+        Returns:
+            Dict of vendor -> (matched_rule, confidence, explanation) for cache hits
+        """
+        rules_by_id = {rule['id']: rule for rule in rules}
+        matches = {}
+        for vendor, (rule_id, confidence, explanation) in db.get_match_cache(vendors).items():
+            if rule_id is None:
+                matches[vendor] = (None, 0.0, explanation)
+            elif rule_id in rules_by_id:
+                matches[vendor] = (rules_by_id[rule_id], confidence, explanation)
+        return matches
+
+    def _match_vendors(
+        self,
+        vendors: List[str],
+        exact_index: Dict[str, dict],
+        patterns: List[str],
+        rules_by_idx: List[dict],
+        max_fuzzy_len: float,
+        length_buckets: Optional[Dict[int, List[int]]] = None
+    ) -> List[Tuple[Optional[dict], float, str]]:
+        """
+        Match normalized vendors to rules, in parallel for large batches.
+
+        Large vendor x pattern batches are scored as one matrix with
+        process.cdist when NumPy is available. Otherwise, many vendors are
+        split across a thread pool (RapidFuzz releases the GIL while
+        scoring). Either way, results keep input order.
+
+        Args:
+            vendors: Distinct normalized vendors
+            exact_index: Normalized pattern -> rule lookup for exact matches
+            patterns: Normalized rule patterns, parallel to rules_by_idx
+            rules_by_idx: List of available rules
+            max_fuzzy_len: Vendor length above which fuzzy matching is skipped
+            length_buckets: Optional pattern length -> indices blocking index
+
+        Returns:
+            One (matched_rule, confidence, explanation) tuple per vendor
+        """
+        def match_chunk(chunk: List[str]) -> List[Tuple[Optional[dict], float, str]]:
+            return [
+                self._match_transaction(
+                    v, exact_index, patterns, rules_by_idx, max_fuzzy_len, length_buckets
+                )
+                for v in chunk
+            ]
+
+        if len(vendors) * len(patterns) >= CDIST_MIN_CELLS:
+            results = self._match_vendors_cdist(
+                vendors, exact_index, patterns, rules_by_idx, max_fuzzy_len
+            )
+            if results is not None:
+                return results
+
+        workers = os.cpu_count() or 1
+        if workers == 1 or len(vendors) < PARALLEL_MATCH_MIN_VENDORS:
+            return match_chunk(vendors)
+
+        chunk_size = -(-len(vendors) // workers)
+        chunks = [vendors[i:i + chunk_size] for i in range(0, len(vendors), chunk_size)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [result for chunk in executor.map(match_chunk, chunks) for result in chunk]
+
+    def _match_vendors_cdist(
+        self,
+        vendors: List[str],
+        exact_index: Dict[str, dict],
+        patterns: List[str],
+        rules_by_idx: List[dict],
+        max_fuzzy_len: float
+    ) -> Optional[List[Tuple[Optional[dict], float, str]]]:
+        """
+        Score all fuzzy candidates as a vendor x pattern matrix.
+
+        Produces the same results as _match_transaction per vendor. Scores
+        are kept as float64 so they equal fuzz.ratio exactly, and argmax
+        keeps the first best pattern, as extractOne does.
+
+        Returns:
+            Match tuples per vendor, or None if NumPy is not installed
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+
+        results: List[Tuple[Optional[dict], float, str]] = []
+        pending = []  # (position, vendor) still needing fuzzy scoring
+        for vendor in vendors:
+            rule = exact_index.get(vendor)
+            if rule is not None:
+                results.append(self._exact_result(rule, vendor))
+                continue
+            if len(vendor) <= max_fuzzy_len:
+                pending.append((len(results), vendor))
+            results.append((None, 0.0, "No matching rule found"))
+
+        # Score in row blocks so the matrix stays within CDIST_MAX_CELLS
+        rows_per_block = max(1, CDIST_MAX_CELLS // len(patterns))
+        for start in range(0, len(pending), rows_per_block):
+            block = pending[start:start + rows_per_block]
+            scores = process.cdist(
+                [vendor for _, vendor in block],
+                patterns,
+                scorer=fuzz.ratio,
+                score_cutoff=FUZZY_MATCH_THRESHOLD,
+                dtype=np.float64,
+                workers=-1
+            )
+            best = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(block)), best]
+            for (position, _), idx, score in zip(block, best.tolist(), best_scores.tolist()):
+                if score >= FUZZY_MATCH_THRESHOLD:
+                    results[position] = self._fuzzy_result(rules_by_idx[idx], score)
+
+        return results
+
+    @staticmethod
+    def _build_length_buckets(patterns: List[str]) -> Dict[int, List[int]]:
+        """Group pattern indices by pattern length, ascending within each bucket."""
+        buckets: Dict[int, List[int]] = {}
+        for idx, pattern in enumerate(patterns):
+            buckets.setdefault(len(pattern), []).append(idx)
+        return buckets
+
+    @staticmethod
+    def _length_candidates(length: int, length_buckets: Dict[int, List[int]]) -> List[int]:
+        """
+        Indices of patterns whose length allows a score at the fuzzy threshold.
+
+        Lossless blocking: any pattern outside this window scores below the
+        threshold. Indices are returned in rule order so ties resolve as
+        they would over the full list.
+        """
+        low = math.floor(length / FUZZY_MAX_LENGTH_RATIO)
+        high = math.ceil(length * FUZZY_MAX_LENGTH_RATIO)
+        candidates = [
+            idx
+            for size, indices in length_buckets.items()
+            if low <= size <= high
+            for idx in indices
+        ]
+        candidates.sort()
+        return candidates
+
+    @staticmethod
+    def _normalize(vendor: str) -> str:
+        """Normalize a vendor or rule pattern for comparison."""
+        return vendor.lower().strip()
+
+    def _match_transaction(
+        self,
+        vendor: str,
+        exact_index: Dict[str, dict],
+        patterns: List[str],
+        rules_by_idx: List[dict],
+        max_fuzzy_len: float = float('inf'),
+        length_buckets: Optional[Dict[int, List[int]]] = None
     ) -> Tuple[Optional[dict], float, str]:
         """
         Match transaction to best rule.
 
         Args:
-            transaction: Transaction to match
-            rules: List of available rules
+            vendor: Normalized (lowercased, stripped) transaction vendor
+            exact_index: Normalized pattern -> rule lookup for exact matches
+            patterns: Normalized rule patterns, parallel to rules_by_idx
+            rules_by_idx: List of available rules
+            max_fuzzy_len: Vendor length above which fuzzy matching is skipped
+            length_buckets: Optional pattern length -> indices blocking index
 
         Returns:
             Tuple of (matched_rule, confidence, explanation)
         """
-        if not rules:
+        if not rules_by_idx:
             return None, 0.0, "No rules available"
 
-        vendor = transaction['vendor'].lower().strip()
+        # Try exact match first - a hit never touches RapidFuzz
+        rule = exact_index.get(vendor)
+        if rule is not None:
+            return self._exact_result(rule, vendor)
 
-        # Try exact match first
-        for rule in rules:
-            if rule['vendor_pattern'].lower().strip() == vendor:
-                return (
-                    rule,
-                    float(rule['confidence']),
-                    f"Exact match for vendor '{vendor}'"
-                )
+        # Too long to reach the similarity threshold against any pattern
+        if len(vendor) > max_fuzzy_len:
+            return None, 0.0, "No matching rule found"
 
-        # Try fuzzy match
-        best_match = None
-        best_score = 0
-
-        for rule in rules:
-            score = fuzz.ratio(vendor, rule['vendor_pattern'].lower().strip())
-            if score > best_score and score >= 85:  # 85% similarity threshold
-                best_score = score
-                best_match = rule
-
-        if best_match:
-            # Combine rule confidence with match score
-            combined_confidence = (float(best_match['confidence']) + (best_score / 100)) / 2
-            return (
-                best_match,
-                combined_confidence,
-                f"Fuzzy match ({best_score}% similar) to '{best_match['vendor_pattern']}'"
-            )
+        # Narrow to patterns of a compatible length when a blocking index exists
+        candidates = None
+        choices = patterns
+        if length_buckets is not None:
+            candidates = self._length_candidates(len(vendor), length_buckets)
+            choices = [patterns[i] for i in candidates]
+
+        # Try fuzzy match - scores all candidates in one RapidFuzz call
+        best = process.extractOne(
+            vendor,
+            choices,
+            scorer=fuzz.ratio,
+            score_cutoff=FUZZY_MATCH_THRESHOLD
+        )
+
+        if best:
+            _, best_score, idx = best
+            if candidates is not None:
+                idx = candidates[idx]
+            return self._fuzzy_result(rules_by_idx[idx], best_score)
 
         return None, 0.0, "No matching rule found"
+
+    @staticmethod
+    def _exact_result(rule: dict, vendor: str) -> Tuple[dict, float, str]:
+        """Build the match tuple for an exact hit."""
+        return rule, float(rule['confidence']), f"Exact match for vendor '{vendor}'"
+
+    @staticmethod
+    def _fuzzy_result(rule: dict, score: float) -> Tuple[dict, float, str]:
+        """Build the match tuple for a fuzzy hit."""
+        # Combine rule confidence with match score
+        combined_confidence = (float(rule['confidence']) + (score / 100)) / 2
+        return (
+            rule,
+            combined_confidence,
+            f"Fuzzy match ({score}% similar) to '{rule['vendor_pattern']}'"
+        )
@@ -5,24 +5,35 @@ Exporter Agent - Generates Sage 50 Audit Trail CSV files.
 from pathlib import Path
 import time
 import csv
-from typing import List, Dict
+import io
+from datetime import date
+from typing import Iterator, List, Dict, Optional
 
-from accountantiq.core.database import Database
+from accountantiq.core.database import Database, open_database
+from accountantiq.core.dates import parse_iso_date
 from accountantiq.core.models import ExporterResult
 
+# Leading characters that spreadsheet apps treat as a formula
+_DANGEROUS_CHARS: frozenset[str] = frozenset("=+-@|%\t")
+
+# Exports up to this many rows are buffered in memory and written at once
+BUFFERED_EXPORT_MAX_ROWS = 50_000
+
 
 class ExporterAgent:
     """Exports coded transactions to Sage 50 format."""
 
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, db: Optional[Database] = None):
         """
         Initialize exporter agent.
 
         Args:
             workspace_path: Path to workspace
+            db: Open database to share (default: each call opens its own)
         """
         self.workspace_path = Path(workspace_path)
         self.db_path = self.workspace_path / "accountant.db"
+        self.db = db
         self.exports_dir = self.workspace_path / "exports"
         self.exports_dir.mkdir(exist_ok=True)
 
@@ -43,13 +54,9 @@ class ExporterAgent:
         """
         start_time = time.time()
 
-        with Database(str(self.db_path)) as db:
+        with open_database(self.db_path, self.db) as db:
             # Get coded transactions
-            bank_txns = db.get_transactions(source="bank")
-            coded = [
-                t for t in bank_txns
-                if t.get('nominal_code') and t.get('nominal_code').strip()
-            ]
+            coded = db.get_transactions(source="bank", coded=True)
 
             if not coded:
                 return ExporterResult(
@@ -99,16 +106,12 @@ class ExporterAgent:
         Returns:
             Sanitized value safe for CSV export
         """
-        if not value or not isinstance(value, str):
+        if not isinstance(value, str) or not value:
             return value or ''
 
         # SECURITY FIX: Prevent CSV injection
         # If field starts with =, +, -, @, |, %, or tab, prefix with single quote
-        dangerous_chars = ('=', '+', '-', '@', '|', '%', '\t')
-        if value and value[0] in dangerous_chars:
-            return "'" + value
-
-        return value
+        return "'" + value if value[0] in _DANGEROUS_CHARS else value
 
     def _export_sage50(self, transactions: List[dict], output_path: Path):
         """
@@ -121,53 +124,76 @@ class ExporterAgent:
             transactions: List of coded transactions
             output_path: Output file path
         """
+        header = [
+            'Date',
+            'Type',
+            'Nominal Code',
+            'Reference',
+            'Details',
+            'Debit',
+            'Credit'
+        ]
+
+        # Small exports are built in memory and written with a single call
+        if len(transactions) <= BUFFERED_EXPORT_MAX_ROWS:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+            writer.writerows(self._sage50_rows(transactions))
+            output_path.write_text(buffer.getvalue(), encoding='utf-8', newline='')
+            return
+
         with open(output_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(self._sage50_rows(transactions))
+
+    def _sage50_rows(self, transactions: List[dict]) -> Iterator[list]:
+        """
+        Yield Sage 50 CSV rows for coded transactions.
 
-            # Write header
-            writer.writerow([
-                'Date',
-                'Type',
-                'Nominal Code',
-                'Reference',
-                'Details',
-                'Debit',
-                'Credit'
-            ])
-
-            for txn in transactions:
-                # Determine debit/credit based on amount
-                amount = float(txn.get('amount', 0))
-
-                # Convert date to DD/MM/YYYY format (Sage format)
-                date_str = txn.get('date', '')
-                if isinstance(date_str, str) and len(date_str) == 10:
-                    # Already in YYYY-MM-DD format
-                    from datetime import datetime
-                    try:
-                        date_obj = datetime.strptime(str(date_str), "%Y-%m-%d")
-                        date_str = date_obj.strftime("%d/%m/%Y")
-                    except (ValueError, TypeError):
-                        pass
-
-                # Determine type and debit/credit
-                if amount > 0:
-                    txn_type = "BR"  # Bank Receipt
-                    debit = amount
-                    credit = 0
-                else:
-                    txn_type = "BP"  # Bank Payment
-                    debit = 0
-                    credit = abs(amount)
-
-                # SECURITY FIX: Sanitize user-controlled fields
-                row = [
-                    date_str,
-                    txn_type,
-                    self._sanitize_csv_field(txn.get('nominal_code', '')),
-                    self._sanitize_csv_field(txn.get('reference', '')),
-                    self._sanitize_csv_field(txn.get('vendor', '')),
-                    f"{debit:.2f}",
-                    f"{credit:.2f}"
-                ]
-                writer.writerow(row)
+        Args:
+            transactions: List of coded transactions
+
+        Yields:
+            Row values in Sage 50 column order
+        """
+        sanitize = self._sanitize_csv_field
+
+        for txn in transactions:
+            # Determine debit/credit based on amount
+            amount = float(txn.get('amount', 0))
+
+            # Convert date to DD/MM/YYYY format (Sage format); database rows
+            # carry datetime.date, other callers may pass YYYY-MM-DD strings
+            txn_date = txn.get('date', '')
+            if isinstance(txn_date, str) and len(txn_date) == 10:
+                try:
+                    txn_date = parse_iso_date(txn_date)
+                except ValueError:
+                    pass
+            if isinstance(txn_date, date):
+                date_str = f"{txn_date.day:02d}/{txn_date.month:02d}/{txn_date.year:04d}"
+            else:
+                date_str = txn_date
+
+            # Determine type and debit/credit
+            if amount > 0:
+                txn_type = "BR"  # Bank Receipt
+                debit = amount
+                credit = 0
+            else:
+                txn_type = "BP"  # Bank Payment
+                debit = 0
+                credit = abs(amount)
+
+            # SECURITY FIX: Sanitize user-controlled fields
+            yield [
+                date_str,
+                txn_type,
+                sanitize(txn.get('nominal_code', '')),
+                sanitize(txn.get('reference', '')),
+                sanitize(txn.get('vendor', '')),
+                f"{debit:.2f}",
+                f"{credit:.2f}"
+            ]
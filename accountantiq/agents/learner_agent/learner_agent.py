@@ -4,26 +4,35 @@ Learner Agent - Builds vendor→nominal code mappings from historical data.
 
 from pathlib import Path
 import time
-from typing import List
-from collections import defaultdict
+from datetime import date as Date
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
 
-from accountantiq.core.database import Database
+import polars as pl
+
+from accountantiq.core.database import Database, open_database
+from accountantiq.core.dates import parse_iso_date
 from accountantiq.core.models import LearnerResult, Rule
 from rapidfuzz import fuzz
 
+# Below this many rows the plain Counter loop beats DataFrame setup cost
+VECTORIZED_ANALYSIS_MIN_ROWS = 1000
+
 
 class LearnerAgent:
     """Learns vendor patterns from historical transactions."""
 
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, db: Optional[Database] = None):
         """
         Initialize learner agent.
 
         Args:
             workspace_path: Path to workspace
+            db: Open database to share (default: each call opens its own)
         """
         self.workspace_path = Path(workspace_path)
         self.db_path = self.workspace_path / "accountant.db"
+        self.db = db
 
     def run(self, min_confidence: float = 0.75, smart_matching: bool = True) -> LearnerResult:
         """
@@ -38,11 +47,11 @@ class LearnerAgent:
         """
         start_time = time.time()
 
-        with Database(str(self.db_path)) as db:
-            # Get historical transactions
-            historical_txns = db.get_transactions(source="history")
+        with open_database(self.db_path, self.db) as db:
+            # Get historical transactions (as columns; rows are only built for smart matching)
+            history = db.get_transactions_df(source="history")
 
-            if not historical_txns:
+            if history.is_empty():
                 return LearnerResult(
                     agent="learner",
                     status="error",
@@ -54,29 +63,28 @@ class LearnerAgent:
             bank_txns = db.get_transactions(source="bank")
 
             # Build vendor→nominal code mappings
-            vendor_mappings = self._analyze_patterns(historical_txns)
+            vendor_mappings = self._analyze_patterns(history)
 
             # If we have bank data, do smart matching by date+amount
             smart_rules = 0
             if smart_matching and bank_txns:
-                smart_rules = self._create_smart_rules(historical_txns, bank_txns, db, min_confidence)
+                smart_rules = self._create_smart_rules(history.to_dicts(), bank_txns, db, min_confidence)
 
             # Generate rules from historical data alone
-            basic_rules = 0
+            new_rules = []
             for vendor_pattern, data in vendor_mappings.items():
                 confidence = data['confidence']
 
                 if confidence >= min_confidence:
-                    rule = Rule(
+                    new_rules.append(Rule.fast_dict(
                         vendor_pattern=vendor_pattern,
                         nominal_code=data['nominal_code'],
                         rule_type="fuzzy",
                         confidence=confidence,
                         match_count=data['count'],
                         created_by="learner"
-                    )
-                    db.insert_rule(rule.to_dict())
-                    basic_rules += 1
+                    ))
+            basic_rules = len(db.insert_rules(new_rules))
 
             total_rules = smart_rules + basic_rules
 
@@ -84,7 +92,7 @@ class LearnerAgent:
             db.log_agent_action(
                 agent_name="learner",
                 action="learn_patterns",
-                input_summary=f"historical_txns={len(historical_txns)}, bank_txns={len(bank_txns)}, smart_matching={smart_matching}",
+                input_summary=f"historical_txns={history.height}, bank_txns={len(bank_txns)}, smart_matching={smart_matching}",
                 output_summary=f"smart_rules={smart_rules}, basic_rules={basic_rules}, total={total_rules}",
                 duration_ms=int((time.time() - start_time) * 1000)
             )
@@ -93,7 +101,7 @@ class LearnerAgent:
                 agent="learner",
                 status="complete",
                 stats={
-                    "historical_transactions": len(historical_txns),
+                    "historical_transactions": history.height,
                     "rules_generated": total_rules,
                     "smart_rules": smart_rules,
                     "basic_rules": basic_rules,
@@ -125,121 +133,140 @@ class LearnerAgent:
         Returns:
             Number of smart rules created
         """
-        from datetime import date as Date
-        from decimal import Decimal
-
-        # Build index of Sage transactions by (date, absolute amount)
+        # Build index of Sage nominal codes by (date, absolute amount)
         sage_index = defaultdict(list)
         for txn in sage_txns:
             if txn.get('nominal_code'):
-                # Create key from date and amount
-                txn_date = txn['date']
-                if isinstance(txn_date, str):
-                    # Convert string date to date object
-                    from datetime import datetime
-                    try:
-                        txn_date = datetime.strptime(txn_date, "%Y-%m-%d").date()
-                    except:
-                        continue
-
-                # Use ABSOLUTE amount (ignore sign differences between bank/Sage)
-                amount = float(txn.get('amount', 0))
-                amount_key = round(abs(amount), 2)
-
-                key = (txn_date, amount_key)
-                sage_index[key].append(txn)
-
-        # Match bank transactions to Sage transactions
-        matches = []
-        for bank_txn in bank_txns:
-            bank_date = bank_txn['date']
-            if isinstance(bank_date, str):
-                from datetime import datetime
-                try:
-                    bank_date = datetime.strptime(bank_date, "%Y-%m-%d").date()
-                except:
-                    continue
-
-            # Use ABSOLUTE amount to match regardless of sign
-            bank_amount = round(abs(float(bank_txn.get('amount', 0))), 2)
-            key = (bank_date, bank_amount)
-
-            # Find matching Sage transaction(s)
-            if key in sage_index:
-                sage_matches = sage_index[key]
-                for sage_txn in sage_matches:
-                    matches.append({
-                        'bank_vendor': bank_txn['vendor'],
-                        'sage_vendor': sage_txn['vendor'],
-                        'nominal_code': sage_txn['nominal_code'],
-                        'date': bank_date,
-                        'amount': bank_amount
-                    })
-
-        # Build rules from matches
-        # Group by bank_vendor → nominal_code
+                key = self._match_key(txn)
+                if key is not None:
+                    sage_index[key].append(txn['nominal_code'])
+
+        # Hash-join bank transactions onto the Sage index and
+        # group by bank_vendor → nominal_code
         vendor_code_map = defaultdict(lambda: defaultdict(int))
-        for match in matches:
-            bank_vendor = match['bank_vendor'].lower().strip()
-            nominal_code = match['nominal_code']
-            vendor_code_map[bank_vendor][nominal_code] += 1
+        for bank_txn in bank_txns:
+            sage_codes = sage_index.get(self._match_key(bank_txn))
+            if not sage_codes:
+                continue
+
+            bank_vendor = bank_txn['vendor'].lower().strip()
+            for nominal_code in sage_codes:
+                vendor_code_map[bank_vendor][nominal_code] += 1
 
         # Create rules
-        rules_created = 0
+        new_rules = []
         for bank_vendor, code_counts in vendor_code_map.items():
             total = sum(code_counts.values())
             most_common = max(code_counts.items(), key=lambda x: x[1])
             nominal_code, count = most_common
 
-            # Calculate confidence (round to 2 decimal places for Pydantic)
             confidence = count / total
-            confidence_rounded = round(confidence, 2)
 
             if confidence >= min_confidence:
-                rule = Rule(
+                new_rules.append(Rule.fast_dict(
                     vendor_pattern=bank_vendor,
                     nominal_code=nominal_code,
                     rule_type="exact",  # Exact match for bank vendor names
-                    confidence=Decimal(str(confidence_rounded)),
+                    confidence=confidence,
                     match_count=count,
                     created_by="learner"
-                )
-                db.insert_rule(rule.to_dict())
-                rules_created += 1
+                ))
+
+        return len(db.insert_rules(new_rules))
 
-        return rules_created
+    def _match_key(self, txn: dict) -> Optional[Tuple[Date, float]]:
+        """
+        Build the (date, absolute amount) join key for smart matching.
+
+        Uses the ABSOLUTE amount so bank and Sage sign conventions match.
 
-    def _analyze_patterns(self, transactions: List[dict]) -> dict:
+        Args:
+            txn: Transaction dict
+
+        Returns:
+            Join key, or None if the date cannot be parsed
+        """
+        txn_date = txn['date']
+        if isinstance(txn_date, str):
+            # Convert string date to date object
+            try:
+                txn_date = parse_iso_date(txn_date)
+            except ValueError:
+                return None
+
+        return txn_date, round(abs(float(txn.get('amount', 0))), 2)
+
+    def _analyze_patterns(self, transactions: pl.DataFrame) -> dict:
         """
         Analyze transaction patterns to build vendor mappings.
 
         Args:
-            transactions: List of historical transactions
+            transactions: Historical transactions (vendor and nominal_code columns)
 
         Returns:
             Dict mapping vendor patterns to nominal codes with confidence
         """
-        vendor_codes = defaultdict(lambda: defaultdict(int))
+        if transactions.height >= VECTORIZED_ANALYSIS_MIN_ROWS:
+            return self._analyze_patterns_vectorized(transactions)
+
+        vendor_codes: Dict[str, Counter] = {}
 
         # Count vendor→nominal code occurrences
-        for txn in transactions:
-            if txn.get('nominal_code'):
-                vendor = txn['vendor'].lower().strip()
-                code = txn['nominal_code']
-                vendor_codes[vendor][code] += 1
+        for vendor, code in transactions.select('vendor', 'nominal_code').iter_rows():
+            if code:
+                vendor = vendor.lower().strip()
+                vendor_codes.setdefault(vendor, Counter())[code] += 1
 
         # Calculate confidence scores
         result = {}
         for vendor, codes in vendor_codes.items():
-            total = sum(codes.values())
-            most_common_code = max(codes.items(), key=lambda x: x[1])
-            code, count = most_common_code
-
-            confidence = count / total
+            code, count = codes.most_common(1)[0]
             result[vendor] = {
                 'nominal_code': code,
                 'count': count,
-                'confidence': confidence
+                'confidence': count / codes.total()
             }
 
         return result
+
+    def _analyze_patterns_vectorized(self, transactions: pl.DataFrame) -> dict:
+        """
+        Polars group-by version of _analyze_patterns for large histories.
+
+        Produces the same mapping: ties between codes go to the code seen
+        first for that vendor, and vendors keep first-seen order.
+
+        Args:
+            transactions: Historical transactions (vendor and nominal_code columns)
+
+        Returns:
+            Dict mapping vendor patterns to nominal codes with confidence
+        """
+        df = transactions.select('vendor', 'nominal_code').with_row_index('row')
+
+        summary = (
+            df.filter(pl.col('nominal_code').is_not_null() & (pl.col('nominal_code') != ''))
+            .with_columns(pl.col('vendor').str.to_lowercase().str.strip_chars())
+            .group_by('vendor', 'nominal_code')
+            .agg(pl.len().alias('count'), pl.col('row').min().alias('first_row'))
+            .sort(['vendor', 'count', 'first_row'], descending=[False, True, False])
+            .group_by('vendor', maintain_order=True)
+            .agg(
+                pl.col('nominal_code').first(),
+                pl.col('count').first(),
+                pl.col('count').sum().alias('total'),
+                pl.col('first_row').min()
+            )
+            .sort('first_row')
+        )
+
+        return {
+            vendor: {
+                'nominal_code': code,
+                'count': count,
+                'confidence': count / total
+            }
+            for vendor, code, count, total in summary.select(
+                'vendor', 'nominal_code', 'count', 'total'
+            ).iter_rows()
+        }
@@ -5,14 +5,69 @@ Custom parser for TransactionHistory.csv format.
 
 import polars as pl
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime
-from decimal import Decimal
+from typing import List, Dict, Any, Iterator
 import re
+import sys
 
 from accountantiq.core.database import Database
 from accountantiq.core.models import Transaction
 
+# Rows per batch when streaming parsed records (see iter_record_batches)
+PARSE_BATCH_ROWS = 10_000
+
+# Amounts are parsed as exact decimals; the scale leaves room to spot
+# (and drop) sub-penny values instead of rounding them away
+_AMOUNT_DTYPE = pl.Decimal(38, 9)
+
+# Merchant extraction patterns, compiled once
+_CARD_MERCHANT = re.compile(r'Card \d+,\s*(.+)')
+_WLT_MERCHANT = re.compile(r'WLT \d+,\s*(.+)')
+_CLS_MERCHANT = re.compile(r'CLS \d+,\s*(.+)')
+
+# Prefixes stripped by _normalize_vendor, applied in this order
+_PREFIX_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'^Card \d+,?\s*',
+        r'^WLT \d+,?\s*',
+        r'^CLS \d+,?\s*',
+        r'^MOB,?\s*',
+        r'^FPS,?\s*',
+    )
+)
+_ANY_PREFIX = re.compile(r'(?:Card \d|WLT \d|CLS \d|MOB|FPS)', re.IGNORECASE)
+
+
+def _card_merchant(vendor: str) -> str:
+    """Card: "Card XX, Merchant Name" -> merchant."""
+    match = _CARD_MERCHANT.search(vendor)
+    return match.group(1).strip() if match else vendor
+
+
+def _transfer_payee(vendor: str) -> str:
+    """Transfer: "FPS, Gbp Faster Payment, Payee" or "MOB, Payee, Details" -> payee."""
+    if vendor.startswith("FPS,"):
+        _, _, rest = vendor.partition(",")
+        _, has_payee, rest = rest.partition(",")
+        if has_payee:
+            return rest.partition(",")[0].strip()
+    elif vendor.startswith("MOB,"):
+        return vendor.partition(",")[2].partition(",")[0].strip()
+    return vendor
+
+
+def _direct_debit_company(vendor: str) -> str:
+    """Direct Debit: "Company Name, Reference" -> company."""
+    return vendor.partition(",")[0].strip()
+
+
+# Vendor extractor for each transaction type; other types keep the description
+_TYPE_EXTRACTORS = {
+    "Card": _card_merchant,
+    "Transfer": _transfer_payee,
+    "Direct Debit": _direct_debit_company,
+}
+
 
 class BankParser:
     """Parses bank statement CSV files (TransactionHistory.csv format)."""
@@ -26,10 +81,50 @@ class BankParser:
         """
         self.db = db
 
-    def parse(self, file_path: str) -> List[Transaction]:
+    def parse(self, file_path: str, low_memory: bool = False) -> List[Transaction]:
         """
         Parse bank statement CSV file.
 
+        Args:
+            file_path: Path to bank CSV file
+            low_memory: Trade speed for a smaller footprint on very large files
+
+        Returns:
+            List of Transaction objects
+        """
+        return Transaction.validate_many(self.parse_records(file_path, low_memory))
+
+    def parse_records(self, file_path: str, low_memory: bool = False) -> List[Dict[str, Any]]:
+        """
+        Parse bank statement CSV file into transaction dicts ready for insertion.
+
+        Args:
+            file_path: Path to bank CSV file
+            low_memory: Trade speed for a smaller footprint on very large files
+
+        Returns:
+            List of transaction dicts, shaped like Transaction.to_dict()
+        """
+        return [
+            record
+            for batch in self.iter_record_batches(file_path, low_memory)
+            for record in batch
+        ]
+
+    def iter_record_batches(
+        self,
+        file_path: str,
+        low_memory: bool = False,
+        batch_size: int = PARSE_BATCH_ROWS
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a bank CSV file as batches of transaction dicts.
+
+        The file is scanned lazily and batches are produced as the streaming
+        query runs, so peak memory follows batch_size rather than file size.
+        Rows are filtered to what the Transaction model accepts, so the
+        dicts skip per-row model validation.
+
         File format (no headers):
         Col 0: Date (YYYYMMDD)
         Col 4: DR/CR indicator
@@ -40,77 +135,85 @@ class BankParser:
 
         Args:
             file_path: Path to bank CSV file
+            low_memory: Trade speed for a smaller footprint on very large files
+            batch_size: Approximate number of rows per batch
 
-        Returns:
-            List of Transaction objects
+        Yields:
+            Lists of transaction dicts, shaped like Transaction.to_dict()
         """
-        # Read CSV with Polars (no headers)
-        df = pl.read_csv(
+        # Scan CSV lazily with Polars (no headers); every column as text so no
+        # inference pass is needed and "1,250.00" style amounts survive.
+        # Only columns 0-9 are used, so extra trailing fields are dropped.
+        lf = pl.scan_csv(
             file_path,
             has_header=False,
             separator=',',
-            quote_char='"'
+            quote_char='"',
+            infer_schema_length=0,
+            truncate_ragged_lines=True,
+            low_memory=low_memory
+        )
+        columns = lf.collect_schema().names()
+
+        def text(idx: int) -> pl.Expr:
+            """Stripped text of column idx ("" if missing or null)."""
+            if idx >= len(columns):
+                return pl.lit("")
+            return pl.col(columns[idx]).str.strip_chars().fill_null("")
+
+        # Parse, clean and filter columns in one streaming Polars query.
+        # Unparseable dates/amounts become null and are dropped with zero amounts.
+        amount_raw = text(7)
+        parsed = lf.select(
+            text(0).str.to_date("%Y%m%d", strict=False).alias("date"),
+            text(6).alias("txn_type"),
+            pl.when(amount_raw == "").then(pl.lit("0")).otherwise(amount_raw)
+            .str.replace_all(",", "")
+            .cast(_AMOUNT_DTYPE, strict=False)
+            .alias("amount"),
+            text(8).alias("description"),
+            text(9).alias("reference"),
+        ).filter(
+            pl.col("date").is_not_null()
+            & pl.col("amount").is_not_null()
+            & (pl.col("amount") != 0)
+            # Transaction.amount allows at most 2 decimal places
+            & (pl.col("amount").round(2) == pl.col("amount"))
+        ).with_columns(
+            # Details string: "type: description (Ref: reference)"
+            pl.format("{}: {}", "txn_type", "description")
+            .add(
+                pl.when((pl.col("reference") != "") & (pl.col("reference") != pl.col("description")))
+                .then(pl.format(" (Ref: {})", "reference"))
+                .otherwise(pl.lit(""))
+            )
+            .alias("details")
         )
 
-        transactions = []
-
-        for row in df.iter_rows(named=False):
-            try:
-                # Extract fields
-                date_str = str(row[0]).strip() if row[0] else ""
-                dr_cr = str(row[4]).strip() if len(row) > 4 and row[4] else ""
-                txn_type = str(row[6]).strip() if len(row) > 6 and row[6] else ""
-                amount_raw = str(row[7]).strip() if len(row) > 7 and row[7] else "0"
-                description = str(row[8]).strip() if len(row) > 8 and row[8] else ""
-                reference = str(row[9]).strip() if len(row) > 9 and row[9] else ""
-
-                # Parse date (YYYYMMDD format)
-                try:
-                    date_obj = datetime.strptime(date_str, "%Y%m%d").date()
-                except (ValueError, TypeError):
-                    # SECURITY FIX: Catch specific exceptions only
-                    continue
-
-                # Parse amount (remove commas, convert to float)
-                try:
-                    amount = float(amount_raw.replace(",", ""))
-                except (ValueError, TypeError, AttributeError):
-                    # SECURITY FIX: Catch specific exceptions only
-                    continue
-
-                # Skip zero amounts
-                if amount == 0:
-                    continue
-
-                # Extract vendor from description
-                vendor = self._extract_vendor(description, txn_type)
-
-                # Build details string
-                details = f"{txn_type}: {description}"
-                if reference and reference != description:
-                    details += f" (Ref: {reference})"
-
-                # Create Transaction object
-                transaction = Transaction(
+        vendors = {}  # (description, txn_type) -> extracted vendor
+
+        for batch in parsed.collect_batches(chunk_size=batch_size, engine="streaming"):
+            records = []
+            for date_obj, txn_type, amount, description, reference, details in batch.iter_rows():
+                # Extract vendor from description (once per distinct description)
+                vendor_key = (description, txn_type)
+                vendor = vendors.get(vendor_key)
+                if vendor is None:
+                    vendor = vendors[vendor_key] = self._extract_vendor(description, txn_type)
+
+                records.append(Transaction.fast_dict(
                     date=date_obj,
                     vendor=vendor,
-                    amount=Decimal(str(amount)),
+                    amount=amount,
+                    source="bank",
                     nominal_code=None,  # To be coded
                     reference=reference,
                     details=details,
-                    source="bank",
                     confidence=None,  # Will be set by classifier
                     assigned_by=None
-                )
+                ))
 
-                transactions.append(transaction)
-
-            except (ValueError, TypeError, IndexError, KeyError) as e:
-                # SECURITY FIX: Only catch expected parsing errors, not critical errors
-                # Skip individual row parsing errors but don't hide database/IO errors
-                continue
-
-        return transactions
+            yield records
 
     def _extract_vendor(self, description: str, txn_type: str) -> str:
         """
@@ -126,44 +229,22 @@ class BankParser:
         # Remove leading/trailing whitespace
         vendor = description.strip()
 
-        # For card transactions, extract merchant name
-        if txn_type == "Card":
-            # Pattern: "Card XX, Merchant Name"
-            match = re.search(r'Card \d+,\s*(.+)', vendor)
-            if match:
-                vendor = match.group(1).strip()
-
-        # For transfers, extract payee
-        elif txn_type == "Transfer":
-            # Pattern: "FPS, Gbp Faster Payment, Payee"
-            # Or: "MOB, Payee, Details"
-            if vendor.startswith("FPS,"):
-                parts = vendor.split(",")
-                if len(parts) >= 3:
-                    vendor = parts[2].strip()
-            elif vendor.startswith("MOB,"):
-                parts = vendor.split(",")
-                if len(parts) >= 2:
-                    vendor = parts[1].strip()
-
-        # For Direct Debits, extract company name
-        elif txn_type == "Direct Debit":
-            # Pattern: "Company Name, Reference"
-            parts = vendor.split(",")
-            if len(parts) >= 1:
-                vendor = parts[0].strip()
+        # Type-specific extraction (card merchant, transfer payee, DD company)
+        extract = _TYPE_EXTRACTORS.get(txn_type)
+        if extract is not None:
+            vendor = extract(vendor)
 
         # For wallet transactions
         if vendor.startswith("WLT "):
             # Pattern: "WLT XX, Merchant"
-            match = re.search(r'WLT \d+,\s*(.+)', vendor)
+            match = _WLT_MERCHANT.search(vendor)
             if match:
                 vendor = match.group(1).strip()
 
         # For contactless
         if vendor.startswith("CLS "):
             # Pattern: "CLS XX, Merchant"
-            match = re.search(r'CLS \d+,\s*(.+)', vendor)
+            match = _CLS_MERCHANT.search(vendor)
             if match:
                 vendor = match.group(1).strip()
 
@@ -185,17 +266,11 @@ class BankParser:
         # Remove extra whitespace
         vendor = " ".join(vendor.split())
 
-        # Remove common patterns
-        patterns = [
-            r'^Card \d+,?\s*',
-            r'^WLT \d+,?\s*',
-            r'^CLS \d+,?\s*',
-            r'^MOB,?\s*',
-            r'^FPS,?\s*',
-        ]
-
-        for pattern in patterns:
-            vendor = re.sub(pattern, '', vendor, flags=re.IGNORECASE)
+        # Remove common patterns (in order; most vendors have none, so one
+        # combined check lets them skip the sequence entirely)
+        if _ANY_PREFIX.match(vendor):
+            for pattern in _PREFIX_PATTERNS:
+                vendor = pattern.sub('', vendor)
 
         # Trim again
         vendor = vendor.strip()
@@ -204,4 +279,5 @@ class BankParser:
         if not vendor:
             return "Unknown"
 
-        return vendor
+        # Interned so repeat merchants share one string (cheap dict/set keys downstream)
+        return sys.intern(vendor)
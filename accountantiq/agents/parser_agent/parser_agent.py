@@ -3,32 +3,38 @@ Parser Agent - Entry point for CSV parsing operations.
 """
 
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 import time
 
-from accountantiq.core.database import Database
+from accountantiq.core.database import Database, open_database
 from accountantiq.core.models import ParserResult
 from accountantiq.agents.parser_agent.sage_parser import SageParser
 from accountantiq.agents.parser_agent.bank_parser import BankParser
 
+# Parser class for each supported file type
+PARSERS = {"sage": SageParser, "bank": BankParser}
+
 
 class ParserAgent:
     """Main parser agent that delegates to specific parsers."""
 
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, db: Optional[Database] = None):
         """
         Initialize parser agent.
 
         Args:
             workspace_path: Path to workspace
+            db: Open database to share (default: each call opens its own)
         """
         self.workspace_path = Path(workspace_path)
         self.db_path = self.workspace_path / "accountant.db"
+        self.db = db
 
     def run(
         self,
         file_path: str,
-        file_type: Literal["sage", "bank"]
+        file_type: Literal["sage", "bank"],
+        low_memory: bool = False
     ) -> ParserResult:
         """
         Run parser on a CSV file.
@@ -36,25 +42,27 @@ class ParserAgent:
         Args:
             file_path: Path to CSV file
             file_type: Type of file ('sage' or 'bank')
+            low_memory: Read the CSV in low-memory mode (for very large files)
 
         Returns:
             ParserResult with statistics
         """
         start_time = time.time()
 
-        with Database(str(self.db_path)) as db:
-            if file_type == "sage":
-                parser = SageParser(db)
-            elif file_type == "bank":
-                parser = BankParser(db)
-            else:
+        with open_database(self.db_path, self.db) as db:
+            if file_type not in PARSERS:
                 raise ValueError(f"Unknown file type: {file_type}")
+            parser = PARSERS[file_type](db)
 
             try:
-                transactions = parser.parse(file_path)
-                rows_inserted = db.insert_transactions_bulk(
-                    [t.to_dict() for t in transactions]
-                )
+                # Insert parsed batches as they stream in, all in one
+                # transaction so a failure part-way leaves nothing behind
+                rows_parsed = 0
+                rows_inserted = 0
+                with db.transaction():
+                    for records in parser.iter_record_batches(file_path, low_memory=low_memory):
+                        rows_parsed += len(records)
+                        rows_inserted += db.insert_transactions_bulk(records)
 
                 # Log action
                 db.log_agent_action(
@@ -69,7 +77,7 @@ class ParserAgent:
                     agent="parser",
                     status="complete",
                     stats={
-                        "rows_parsed": len(transactions),
+                        "rows_parsed": rows_parsed,
                         "rows_inserted": rows_inserted,
                         "errors": 0
                     },
@@ -4,14 +4,20 @@ Custom parser for AUDITDL2.csv format.
 """
 
 import polars as pl
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime
-from decimal import Decimal
+from typing import List, Dict, Any, Iterator
 
 from accountantiq.core.database import Database
 from accountantiq.core.models import Transaction
 
+# Rows per batch when streaming parsed records (see iter_record_batches)
+PARSE_BATCH_ROWS = 10_000
+
+# Amounts are parsed as exact decimals; the scale leaves room to spot
+# (and drop) sub-penny values instead of rounding them away
+_AMOUNT_DTYPE = pl.Decimal(38, 9)
+
 
 class SageParser:
     """Parses Sage 50 Audit Trail CSV files (AUDITDL2.csv format)."""
@@ -25,10 +31,50 @@ class SageParser:
         """
         self.db = db
 
-    def parse(self, file_path: str) -> List[Transaction]:
+    def parse(self, file_path: str, low_memory: bool = False) -> List[Transaction]:
         """
         Parse Sage 50 Audit Trail CSV file.
 
+        Args:
+            file_path: Path to Sage CSV file
+            low_memory: Trade speed for a smaller footprint on very large files
+
+        Returns:
+            List of Transaction objects
+        """
+        return Transaction.validate_many(self.parse_records(file_path, low_memory))
+
+    def parse_records(self, file_path: str, low_memory: bool = False) -> List[Dict[str, Any]]:
+        """
+        Parse Sage 50 Audit Trail CSV file into transaction dicts ready for insertion.
+
+        Args:
+            file_path: Path to Sage CSV file
+            low_memory: Trade speed for a smaller footprint on very large files
+
+        Returns:
+            List of transaction dicts, shaped like Transaction.to_dict()
+        """
+        return [
+            record
+            for batch in self.iter_record_batches(file_path, low_memory)
+            for record in batch
+        ]
+
+    def iter_record_batches(
+        self,
+        file_path: str,
+        low_memory: bool = False,
+        batch_size: int = PARSE_BATCH_ROWS
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a Sage CSV file as batches of transaction dicts.
+
+        The file is scanned lazily and batches are produced as the streaming
+        query runs, so peak memory follows batch_size rather than file size.
+        Rows are filtered to what the Transaction model accepts, so the
+        dicts skip per-row model validation.
+
         File format (no headers):
         Col 0: Transaction ID
         Col 1: Type (JC/JD/BR/BP)
@@ -41,84 +87,93 @@ class SageParser:
 
         Args:
             file_path: Path to Sage CSV file
+            low_memory: Trade speed for a smaller footprint on very large files
+            batch_size: Approximate number of rows per batch
 
-        Returns:
-            List of Transaction objects
+        Yields:
+            Lists of transaction dicts, shaped like Transaction.to_dict()
         """
-        # Read CSV with Polars (no headers)
-        df = pl.read_csv(
+        # Scan CSV lazily with Polars (no headers); every column as text so no
+        # inference pass is needed and codes like "0030" keep their zeros.
+        lf = pl.scan_csv(
             file_path,
             has_header=False,
             separator=',',
-            quote_char='"'
+            quote_char='"',
+            infer_schema_length=0,
+            truncate_ragged_lines=True,
+            low_memory=low_memory
         )
+        columns = lf.collect_schema().names()
+
+        def text(idx: int) -> pl.Expr:
+            """Stripped text of column idx ("" if missing or null)."""
+            if idx >= len(columns):
+                return pl.lit("")
+            return pl.col(columns[idx]).str.strip_chars().fill_null("")
+
+        def money(idx: int) -> pl.Expr:
+            """Amount in column idx (0 if blank, null if unparseable)."""
+            raw = text(idx)
+            return pl.when(raw == "").then(pl.lit(0).cast(_AMOUNT_DTYPE)).otherwise(raw.cast(_AMOUNT_DTYPE, strict=False))
+
+        # Parse, clean, filter and deduplicate in one streaming Polars query.
+        # Rows with no nominal code, a bad date, or an unparseable, zero or
+        # sub-penny amount are dropped. The same transaction can appear
+        # multiple times in the audit trail, so duplicates (keyed with the
+        # amount in whole pence) keep only their first occurrence.
+        vendor = text(14)
+        parsed = lf.select(
+            text(0).alias("txn_id"),
+            text(1).alias("txn_type"),
+            text(2).alias("nominal_code"),
+            text(3).str.to_date("%d/%m/%Y", strict=False).alias("date"),
+            text(4).alias("reference"),
+            (money(5) - money(6)).alias("amount"),
+            pl.when(vendor == "").then(pl.lit("Unknown")).otherwise(vendor).alias("vendor"),
+        ).filter(
+            (pl.col("nominal_code").str.strip_chars("0") != "")
+            & pl.col("date").is_not_null()
+            & pl.col("amount").is_not_null()
+            & (pl.col("amount") != 0)
+            # Transaction.amount allows at most 2 decimal places
+            & (pl.col("amount").round(2) == pl.col("amount"))
+        ).with_columns(
+            (pl.col("amount") * 100).cast(pl.Int64).alias("amount_pence")
+        ).unique(
+            subset=["txn_id", "nominal_code", "amount_pence", "vendor"],
+            keep="first",
+            maintain_order=True
+        ).with_columns(
+            # Details string: "type: vendor (Ref: reference)"
+            pl.format("{}: {}", "txn_type", "vendor")
+            .add(
+                pl.when(pl.col("reference") != "")
+                .then(pl.format(" (Ref: {})", "reference"))
+                .otherwise(pl.lit(""))
+            )
+            .alias("details")
+        )
+
+        parsed = parsed.select("nominal_code", "date", "reference", "amount", "vendor", "details")
 
-        transactions = []
-        seen_combos = set()  # Track unique transaction+nominal combinations
-
-        for row in df.iter_rows(named=False):
-            try:
-                # Extract fields
-                txn_id = str(row[0]) if row[0] else ""
-                txn_type = str(row[1]).strip() if row[1] else ""
-                nominal_code = str(row[2]).strip() if row[2] else None
-                date_str = str(row[3]).strip() if row[3] else ""
-                reference = str(row[4]).strip() if row[4] else ""
-                debit = float(row[5]) if row[5] else 0.0
-                credit = float(row[6]) if row[6] else 0.0
-
-                # Vendor is at column 14
-                vendor = str(row[14]).strip() if len(row) > 14 and row[14] else "Unknown"
-
-                # Skip if no nominal code
-                if not nominal_code or nominal_code == "0":
-                    continue
-
-                # Parse date (DD/MM/YYYY format)
-                try:
-                    date_obj = datetime.strptime(date_str, "%d/%m/%Y").date()
-                except (ValueError, TypeError):
-                    # SECURITY FIX: Catch specific exceptions only
-                    continue
-
-                # Calculate amount (debit positive, credit negative for consistency)
-                amount = debit - credit
-                if amount == 0:
-                    continue
-
-                # Create unique key to avoid duplicates
-                # (Same transaction can appear multiple times in audit trail)
-                unique_key = f"{txn_id}_{nominal_code}_{amount}_{vendor}"
-                if unique_key in seen_combos:
-                    continue
-                seen_combos.add(unique_key)
-
-                # Build details string
-                details = f"{txn_type}: {vendor}"
-                if reference:
-                    details += f" (Ref: {reference})"
-
-                # Create Transaction object
-                transaction = Transaction(
+        for batch in parsed.collect_batches(chunk_size=batch_size, engine="streaming"):
+            records = []
+            for nominal_code, date_obj, reference, amount, vendor, details in batch.iter_rows():
+                records.append(Transaction.fast_dict(
                     date=date_obj,
-                    vendor=vendor,
-                    amount=Decimal(str(amount)),
-                    nominal_code=nominal_code,
+                    # Vendors and codes repeat heavily; interning shares one string each
+                    vendor=sys.intern(vendor),
+                    amount=amount,
+                    source="history",
+                    nominal_code=sys.intern(nominal_code),
                     reference=reference,
                     details=details,
-                    source="history",
-                    confidence=Decimal("1.0"),  # Historical data is 100% confident
+                    confidence=1.0,  # Historical data is 100% confident
                     assigned_by="sage_import"
-                )
-
-                transactions.append(transaction)
-
-            except (ValueError, TypeError, IndexError, KeyError) as e:
-                # SECURITY FIX: Only catch expected parsing errors, not critical errors
-                # Skip individual row parsing errors but don't hide database/IO errors
-                continue
+                ))
 
-        return transactions
+            yield records
 
     def _normalize_vendor(self, vendor: str) -> str:
         """
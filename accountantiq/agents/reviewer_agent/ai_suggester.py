@@ -3,9 +3,72 @@ AI-powered nominal code suggester.
 Combines rule-based + LLM suggestions for transaction coding.
 """
 
+from functools import lru_cache
+import heapq
 from typing import Dict, List, Optional, Tuple
 import os
 from decimal import Decimal
+import re
+
+
+# A CODE/REASONING/CONFIDENCE line in an LLM response: (field, rest of line)
+_LLM_FIELD = re.compile(r'^\s*(CODE|REASONING|CONFIDENCE):(.*)$', re.MULTILINE)
+
+# Keyword categories for rule-based suggestions, checked in order:
+# (nominal_code, reasoning, confidence, keywords)
+_KEYWORD_RULES = (
+    # IT & Software
+    ('7100', 'IT/Software subscription (keyword match)', 0.80,
+     ('apple', 'microsoft', 'google', 'software', 'adobe', 'dropbox', 'zoom')),
+    # Travel & Subsistence
+    ('7400', 'Travel & Subsistence (keyword match)', 0.75,
+     ('hotel', 'restaurant', 'cafe', 'food', 'eat', 'coffee', 'lunch', 'dinner')),
+    # Motor expenses
+    ('7500', 'Motor expenses (keyword match)', 0.75,
+     ('parking', 'fuel', 'petrol', 'diesel', 'uber', 'taxi', 'car', 'mot', 'kwik fit')),
+    # Insurance
+    ('7104', 'Insurance (keyword match)', 0.85,
+     ('insurance', 'admiral')),
+    # Medical/Health
+    ('7200', 'Medical/Healthcare (keyword match)', 0.80,
+     ('medical', 'dental', 'doctor', 'pharma', 'health', 'clinic', 'surgery')),
+    # Professional fees
+    ('7600', 'Professional fees (keyword match)', 0.75,
+     ('professional', 'membership', 'gdc', 'registration', 'subscription', 'accountant')),
+    # Stationery/Office
+    ('7300', 'Office supplies (keyword match)', 0.70,
+     ('stationery', 'office', 'supplies', 'paper', 'printer', 'ink')),
+    # Purchases (Amazon, eBay, etc)
+    ('5000', 'Purchases (keyword match)', 0.65,
+     ('amazon', 'ebay', 'purchase', 'buy')),
+    # Utilities
+    ('7200', 'Utilities (keyword match)', 0.75,
+     ('electric', 'gas', 'water', 'broadband', 'internet', 'phone', 'mobile')),
+    # Bank charges
+    ('7901', 'Bank charges (keyword match)', 0.90,
+     ('charges', 'bank fee', 'overdraft')),
+)
+
+
+# Each category's keywords compiled into one alternation, so a category is a single scan
+_KEYWORD_PATTERNS = tuple(
+    re.compile("|".join(re.escape(word) for word in keywords))
+    for _, _, _, keywords in _KEYWORD_RULES
+)
+
+# Amounts above this (either sign) are flagged as possible capital expenditure
+HIGH_VALUE_THRESHOLD = 500
+HIGH_VALUE_SUGGESTION = ('0030', 'Possible capital expenditure (high value)', 0.50)
+
+
+@lru_cache(maxsize=8192)
+def _scan_keywords(combined: str) -> Tuple[Tuple[str, str, float], ...]:
+    """Keyword-category suggestions for a lowercased vendor + details string (memoized)."""
+    return tuple(
+        (code, reason, confidence)
+        for (code, reason, confidence, _), pattern in zip(_KEYWORD_RULES, _KEYWORD_PATTERNS)
+        if pattern.search(combined)
+    )
 
 
 class AISuggester:
@@ -22,6 +85,7 @@ class AISuggester:
         self.use_llm = use_llm
         self.llm_provider = llm_provider
         self.llm_client = None
+        self._codes_context_cache = None  # (codes items, formatted context)
 
         if use_llm:
             self._initialize_llm()
@@ -97,51 +161,11 @@ class AISuggester:
         amount = float(transaction.get('amount', 0))
         combined = vendor + ' ' + details
 
-        suggestions = []
-
-        # IT & Software
-        if any(x in combined for x in ['apple', 'microsoft', 'google', 'software', 'adobe', 'dropbox', 'zoom']):
-            suggestions.append(('7100', 'IT/Software subscription (keyword match)', 0.80))
-
-        # Travel & Subsistence
-        if any(x in combined for x in ['hotel', 'restaurant', 'cafe', 'food', 'eat', 'coffee', 'lunch', 'dinner']):
-            suggestions.append(('7400', 'Travel & Subsistence (keyword match)', 0.75))
-
-        # Motor expenses
-        if any(x in combined for x in ['parking', 'fuel', 'petrol', 'diesel', 'uber', 'taxi', 'car', 'mot', 'kwik fit']):
-            suggestions.append(('7500', 'Motor expenses (keyword match)', 0.75))
-
-        # Insurance
-        if 'insurance' in combined or 'admiral' in combined:
-            suggestions.append(('7104', 'Insurance (keyword match)', 0.85))
-
-        # Medical/Health
-        if any(x in combined for x in ['medical', 'dental', 'doctor', 'pharma', 'health', 'clinic', 'surgery']):
-            suggestions.append(('7200', 'Medical/Healthcare (keyword match)', 0.80))
-
-        # Professional fees
-        if any(x in combined for x in ['professional', 'membership', 'gdc', 'registration', 'subscription', 'accountant']):
-            suggestions.append(('7600', 'Professional fees (keyword match)', 0.75))
-
-        # Stationery/Office
-        if any(x in combined for x in ['stationery', 'office', 'supplies', 'paper', 'printer', 'ink']):
-            suggestions.append(('7300', 'Office supplies (keyword match)', 0.70))
-
-        # Purchases (Amazon, eBay, etc)
-        if any(x in combined for x in ['amazon', 'ebay', 'purchase', 'buy']):
-            suggestions.append(('5000', 'Purchases (keyword match)', 0.65))
-
-        # Utilities
-        if any(x in combined for x in ['electric', 'gas', 'water', 'broadband', 'internet', 'phone', 'mobile']):
-            suggestions.append(('7200', 'Utilities (keyword match)', 0.75))
-
-        # Bank charges
-        if any(x in combined for x in ['charges', 'bank fee', 'overdraft']):
-            suggestions.append(('7901', 'Bank charges (keyword match)', 0.90))
+        suggestions = list(_scan_keywords(combined))
 
         # High-value items might be capital expenditure
-        if abs(amount) > 500:
-            suggestions.append(('0030', 'Possible capital expenditure (high value)', 0.50))
+        if abs(amount) > HIGH_VALUE_THRESHOLD:
+            suggestions.append(HIGH_VALUE_SUGGESTION)
 
         return suggestions
 
@@ -162,11 +186,7 @@ class AISuggester:
         date = transaction.get('date', '')
 
         # Format nominal codes for context
-        codes_context = ""
-        if nominal_codes:
-            codes_context = "\n\nAvailable Nominal Codes:\n"
-            for code, desc in sorted(nominal_codes.items())[:20]:  # Show top 20
-                codes_context += f"- {code}: {desc}\n"
+        codes_context = self._codes_context(nominal_codes)
 
         prompt = f"""You are an expert accountant helping code business transactions.
 
@@ -229,25 +249,44 @@ If unsure, suggest multiple codes, one per line."""
             print(f"⚠ LLM suggestion failed: {e}")
             return []
 
+    def _codes_context(self, nominal_codes: Dict[str, str] = None) -> str:
+        """Format the nominal codes prompt section, reusing it while the codes are unchanged."""
+        if not nominal_codes:
+            return ""
+
+        # Keyed on the contents, so a dict updated in place is reformatted
+        key = tuple(nominal_codes.items())
+        cached = self._codes_context_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        lines = [
+            f"- {code}: {desc}\n"
+            for code, desc in heapq.nsmallest(20, nominal_codes.items())  # Show top 20
+        ]
+        codes_context = "\n\nAvailable Nominal Codes:\n" + "".join(lines)
+        self._codes_context_cache = (key, codes_context)
+        return codes_context
+
     def _parse_llm_response(self, content: str) -> List[Tuple[str, str, float]]:
         """Parse LLM response into suggestions."""
         suggestions = []
-        lines = content.strip().split('\n')
 
         current_code = None
         current_reason = None
         current_conf = None
 
-        for line in lines:
-            line = line.strip()
-            if line.startswith('CODE:'):
-                current_code = line.replace('CODE:', '').strip()
-            elif line.startswith('REASONING:'):
-                current_reason = line.replace('REASONING:', '').strip()
-            elif line.startswith('CONFIDENCE:'):
-                conf_str = line.replace('CONFIDENCE:', '').strip()
+        # One regex pass finds the CODE/REASONING/CONFIDENCE lines; other lines are ignored
+        for match in _LLM_FIELD.finditer(content):
+            field = match.group(1)
+            value = match.group(2).replace(f"{field}:", "").strip()
+            if field == 'CODE':
+                current_code = value
+            elif field == 'REASONING':
+                current_reason = value
+            else:
                 try:
-                    current_conf = float(conf_str)
+                    current_conf = float(value)
                 except ValueError:
                     current_conf = 0.7  # Default
 
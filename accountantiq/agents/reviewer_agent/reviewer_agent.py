@@ -4,24 +4,26 @@ Reviewer Agent - Handles exceptions and learns from user corrections.
 
 from pathlib import Path
 import time
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from accountantiq.core.database import Database
+from accountantiq.core.database import Database, open_database
 from accountantiq.core.models import ReviewerResult, Rule, Override
 
 
 class ReviewerAgent:
     """Reviews low-confidence transactions and learns from corrections."""
 
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, db: Optional[Database] = None):
         """
         Initialize reviewer agent.
 
         Args:
             workspace_path: Path to workspace
+            db: Open database to share (default: each call opens its own)
         """
         self.workspace_path = Path(workspace_path)
         self.db_path = self.workspace_path / "accountant.db"
+        self.db = db
 
     def run(
         self,
@@ -40,13 +42,14 @@ class ReviewerAgent:
         """
         start_time = time.time()
 
-        with Database(str(self.db_path)) as db:
-            # Get transactions needing review
-            all_txns = db.get_transactions(source="bank", reviewed=False)
-            needs_review = [
-                t for t in all_txns
-                if t.get('confidence') is None or float(t.get('confidence', 0)) < review_threshold
-            ]
+        with open_database(self.db_path, self.db) as db:
+            # Count transactions needing review; the rows themselves are
+            # not used here, so none are fetched
+            needs_review = db.count_transactions(
+                source="bank",
+                reviewed=False,
+                needs_review_below=review_threshold
+            )
 
             if not needs_review:
                 return ReviewerResult(
@@ -72,13 +75,13 @@ class ReviewerAgent:
                 pass
             else:
                 # Non-interactive mode - just collect stats
-                reviewed = len(needs_review)
+                reviewed = needs_review
 
             # Log action
             db.log_agent_action(
                 agent_name="reviewer",
                 action="review_transactions",
-                input_summary=f"needs_review={len(needs_review)}",
+                input_summary=f"needs_review={needs_review}",
                 output_summary=f"reviewed={reviewed}, overridden={overridden}",
                 duration_ms=int((time.time() - start_time) * 1000)
             )
@@ -113,46 +116,84 @@ class ReviewerAgent:
         Returns:
             New rule ID if created, else None
         """
-        with Database(str(self.db_path)) as db:
-            # Get transaction
-            txns = db.get_transactions()
-            txn = next((t for t in txns if t['id'] == transaction_id), None)
-
-            if not txn:
-                return None
-
-            original_code = txn.get('nominal_code')
+        return self.handle_overrides([(transaction_id, corrected_code)], create_rule)[0]
 
-            # Create override record
-            override = Override(
-                transaction_id=transaction_id,
-                original_code=original_code,
-                corrected_code=corrected_code
-            )
+    def handle_overrides(
+        self,
+        corrections: List[Tuple[int, str]],
+        create_rule: bool = True
+    ) -> List[Optional[int]]:
+        """
+        Handle a batch of user overrides in one database session.
 
-            # Update transaction
-            db.update_transaction(transaction_id, {
-                'nominal_code': corrected_code,
-                'confidence': 1.0,
-                'reviewed': True,
-                'assigned_by': 'reviewer',
-                'explanation': f"User override from {original_code} to {corrected_code}"
-            })
-
-            # Create rule if requested
-            rule_id = None
-            if create_rule:
-                rule = Rule(
-                    vendor_pattern=txn['vendor'],
-                    nominal_code=corrected_code,
-                    rule_type="exact",
-                    confidence=0.90,  # High confidence for user-created rules
-                    created_by="reviewer"
-                )
-                rule_id = db.insert_rule(rule.to_dict())
-                override.created_rule_id = rule_id
+        Same effect as calling handle_override for each correction in turn,
+        but the transactions are read in one query and the updates, rules
+        and override records are each written as one statement.
 
-            # Save override
-            db.insert_override(override.to_dict())
+        Args:
+            corrections: (transaction_id, corrected_code) pairs
+            create_rule: If True, create a new rule from each override
 
-            return rule_id
+        Returns:
+            New rule ID (or None) for each correction, in input order
+        """
+        with open_database(self.db_path, self.db) as db:
+            # Get transactions
+            txns = db.get_transactions_by_ids([txn_id for txn_id, _ in corrections])
+
+            # Build every record before writing so a bad correction leaves
+            # nothing half-applied. Codes are tracked as they change, so a
+            # transaction corrected twice records the first correction as
+            # the second one's original code.
+            current_codes = {txn_id: txn.get('nominal_code') for txn_id, txn in txns.items()}
+            overrides = []
+            reviews = []
+            rules = []
+            positions = []
+            for position, (transaction_id, corrected_code) in enumerate(corrections):
+                txn = txns.get(transaction_id)
+                if not txn:
+                    continue
+
+                original_code = current_codes[transaction_id]
+                current_codes[transaction_id] = corrected_code
+
+                # Create override record
+                overrides.append(Override(
+                    transaction_id=transaction_id,
+                    original_code=original_code,
+                    corrected_code=corrected_code
+                ))
+                reviews.append((
+                    transaction_id,
+                    corrected_code,
+                    1.0,
+                    'reviewer',
+                    f"User override from {original_code} to {corrected_code}"
+                ))
+
+                # Create rule if requested
+                if create_rule:
+                    rules.append(Rule(
+                        vendor_pattern=txn['vendor'],
+                        nominal_code=corrected_code,
+                        rule_type="exact",
+                        confidence=0.90,  # High confidence for user-created rules
+                        created_by="reviewer"
+                    ).to_dict())
+                    positions.append(position)
+
+            rule_ids: List[Optional[int]] = [None] * len(corrections)
+            with db.transaction():
+                db.bulk_update_transaction_reviews(reviews)
+
+                if rules:
+                    # Overrides are frozen; link each to its rule on a copy
+                    for index, (position, rule_id) in enumerate(zip(positions, db.insert_rules(rules))):
+                        overrides[index] = overrides[index].model_copy(update={'created_rule_id': rule_id})
+                        rule_ids[position] = rule_id
+
+                # Save overrides
+                db.bulk_insert_overrides([override.to_dict() for override in overrides])
+
+            return rule_ids
@@ -6,10 +6,10 @@ import typer
 from typing import Optional
 from pathlib import Path
 from rich.console import Console
-from rich.table import Table
 
-from accountantiq.core.workspace import WorkspaceManager, Workspace
-from accountantiq.orchestrator import AccountantOrchestrator
+# Workspace, orchestrator and table imports live in the commands that use
+# them: the orchestrator pulls in every agent and its dependencies, which
+# --help and the workspace and rules commands don't need.
 
 app = typer.Typer(
     name="accountantiq",
@@ -39,6 +39,8 @@ def process(
     """
     Run full processing pipeline: parse → learn → classify → review → export.
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
         results = orchestrator.run_full_pipeline(
@@ -62,6 +64,8 @@ def parse(
     """
     Parse a CSV file (Sage or bank statement).
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
 
@@ -94,6 +98,8 @@ def learn(
     """
     Learn vendor patterns from historical data.
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
         result = orchestrator.learn_patterns(min_confidence=min_confidence)
@@ -120,6 +126,8 @@ def classify(
     """
     Classify uncoded bank transactions.
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
         result = orchestrator.classify_transactions(confidence_threshold=threshold)
@@ -146,6 +154,8 @@ def review(
     """
     Review low-confidence transactions.
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
         result = orchestrator.review_exceptions(interactive=not non_interactive)
@@ -171,6 +181,8 @@ def export(
     """
     Export coded transactions to Sage format.
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
         result = orchestrator.export_transactions(output_filename=output)
@@ -196,6 +208,8 @@ def stats(
     """
     Display workspace statistics.
     """
+    from accountantiq.orchestrator import AccountantOrchestrator
+
     try:
         orchestrator = AccountantOrchestrator(workspace)
         orchestrator.display_stats()
@@ -215,6 +229,8 @@ def workspace_create(
     """
     Create a new workspace.
     """
+    from accountantiq.core.workspace import WorkspaceManager
+
     try:
         manager = WorkspaceManager()
 
@@ -238,6 +254,9 @@ def workspace_list():
     """
     List all workspaces.
     """
+    from accountantiq.core.workspace import WorkspaceManager
+    from rich.table import Table
+
     try:
         manager = WorkspaceManager()
         workspaces = manager.list_workspaces()
@@ -267,6 +286,8 @@ def workspace_delete(
     """
     Delete a workspace.
     """
+    from accountantiq.core.workspace import WorkspaceManager
+
     try:
         if not confirm:
             console.print(
@@ -294,12 +315,15 @@ def rules_list(
     """
     List rules in workspace.
     """
+    from accountantiq.core.workspace import Workspace
+    from rich.table import Table
+
     try:
         ws = Workspace(workspace)
         ws.load()
 
         with ws.get_database() as db:
-            rules = db.get_rules(min_confidence=min_confidence)
+            rules = db.get_rules_for_display(min_confidence=min_confidence)
 
         if not rules:
             console.print("No rules found.")
@@ -313,15 +337,8 @@ def rules_list(
         table.add_column("Confidence", style="magenta")
         table.add_column("Matches", style="white")
 
-        for rule in rules:
-            table.add_row(
-                str(rule['id']),
-                rule['vendor_pattern'],
-                rule['nominal_code'],
-                rule['rule_type'],
-                f"{float(rule['confidence']):.1%}",
-                str(rule['match_count'])
-            )
+        for row in rules:
+            table.add_row(*row)
 
         console.print(table)
 
@@ -339,6 +356,8 @@ def rules_delete(
     """
     Delete a rule.
     """
+    from accountantiq.core.workspace import Workspace
+
     try:
         if not confirm:
             console.print(
@@ -4,9 +4,40 @@ Shared database for agent communication and data persistence.
 """
 
 import duckdb
+import polars as pl
+from duckdb import ColumnExpression, ConstantExpression, FunctionExpression
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Set
 from datetime import datetime
+from decimal import Decimal, ROUND_CEILING
+
+# Database files whose schema this process has already created, so
+# reopening them skips the DDL
+_SCHEMAS_INITIALIZED: Set[Path] = set()
+
+# Polars type for staging amounts: wide enough to hold any input exactly, so
+# DuckDB rounds (half away from zero) and range-checks them into DECIMAL(10,2)
+_AMOUNT_DTYPE = pl.Decimal(38, 9)
+
+
+def _confidence_bound(threshold: float) -> Decimal:
+    """
+    Convert a confidence threshold to a 2-place Decimal for SQL comparisons.
+
+    Confidence columns are DECIMAL(3,2), so comparing with a Decimal avoids
+    casting every row to DOUBLE. Rounding up keeps both `confidence >= bound`
+    and `confidence < bound` selecting the same rows as the raw threshold.
+    """
+    return Decimal(str(threshold)).quantize(Decimal("0.01"), rounding=ROUND_CEILING)
+
+
+def _decimal_amount(amount: Any) -> Optional[Decimal]:
+    """An amount as a Decimal for staging (the parsers already produce Decimals)."""
+    if amount is None or isinstance(amount, Decimal):
+        return amount
+    # Through str, so 12.345 stages as written rather than as its binary float
+    return Decimal(str(amount))
 
 
 class Database:
@@ -21,8 +52,17 @@ class Database:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # A file created by this connect (even at a cached path, after a
+        # delete) always gets its schema; known files skip the DDL
+        schema_key = self.db_path.resolve()
+        schema_known = schema_key in _SCHEMAS_INITIALIZED and self.db_path.exists()
         self.conn = duckdb.connect(str(self.db_path))
-        self._initialize_schema()
+        self._in_transaction = False
+        self._update_set_clauses: Dict[tuple, str] = {}
+        if not schema_known:
+            self._initialize_schema()
+            if self.db_path.exists():
+                _SCHEMAS_INITIALIZED.add(schema_key)
 
     def _initialize_schema(self):
         """Create all tables if they don't exist."""
@@ -86,6 +126,21 @@ class Database:
             )
         """)
 
+        # Classifier match cache - vendor match results reused across runs
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS classifier_match_cache (
+                vendor_norm TEXT PRIMARY KEY,
+                rule_id INTEGER,
+                confidence DOUBLE,
+                explanation TEXT,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                rules_fingerprint TEXT
+            )
+        """)
+        self.conn.execute("""
+            ALTER TABLE classifier_match_cache ADD COLUMN IF NOT EXISTS rules_fingerprint TEXT
+        """)
+
         # Create sequence for auto-incrementing IDs
         self.conn.execute("""
             CREATE SEQUENCE IF NOT EXISTS seq_transactions START 1
@@ -100,6 +155,60 @@ class Database:
             CREATE SEQUENCE IF NOT EXISTS seq_agent_logs START 1
         """)
 
+        # Indexes for the hot lookup paths (id lookups use the primary keys).
+        # Transaction and rule filters are low-cardinality or range scans
+        # that DuckDB answers by scanning, and an indexed column turns each
+        # UPDATE of it into a delete + insert, so those tables get none.
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_logs_agent ON agent_logs(agent_name, created_at DESC)
+        """)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group statements into a single BEGIN/COMMIT, rolling back on error.
+
+        Nested uses join the outermost transaction, so bulk helpers can be
+        called inside a caller's wider transaction.
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        self.conn.execute("BEGIN TRANSACTION")
+        self._in_transaction = True
+        try:
+            yield
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._in_transaction = False
+
+    def _executemany_in_transaction(self, query: str, rows: List[Any]) -> None:
+        """Run an executemany batch inside a single BEGIN/COMMIT."""
+        with self.transaction():
+            self.conn.executemany(query, rows)
+
+    @contextmanager
+    def _staged(self, name: str, frame: pl.DataFrame):
+        """Expose a Polars frame to SQL as a view named name within the block."""
+        # Pass the raw stream capsule, not the frame, so DuckDB reads it
+        # directly instead of converting through pyarrow
+        self.conn.register(name, self.conn.from_arrow(frame.__arrow_c_stream__()))
+        try:
+            yield
+        finally:
+            self.conn.unregister(name)
+
+    def _next_ids(self, sequence: str, count: int) -> List[int]:
+        """Reserve count consecutive values from an ID sequence."""
+        result = self.conn.execute(
+            f"SELECT nextval('{sequence}') FROM range(?)", [count]
+        ).fetchall()
+        return [row[0] for row in result]
+
     # Transaction operations
     def insert_transaction(self, transaction: Dict[str, Any]) -> int:
         """Insert a transaction and return its ID."""
@@ -127,47 +236,156 @@ class Database:
         return result[0]
 
     def insert_transactions_bulk(self, transactions: List[Dict[str, Any]]) -> int:
-        """Insert multiple transactions efficiently."""
-        count = 0
-        for txn in transactions:
-            self.insert_transaction(txn)
-            count += 1
-        return count
+        """
+        Insert multiple transactions efficiently.
+
+        The rows are staged as one columnar Polars frame and handed to DuckDB
+        over the Arrow C stream interface, so the whole batch is a single
+        INSERT ... SELECT instead of one bound statement per row.
+        """
+        if not transactions:
+            return 0
+
+        text_columns = (
+            'vendor', 'nominal_code', 'reference', 'details',
+            'source', 'explanation', 'assigned_by'
+        )
+        staged = pl.DataFrame(
+            [
+                pl.Series('date', [txn['date'] for txn in transactions]),
+                # Exact decimals, so amounts never pass through a float
+                pl.Series('amount', [_decimal_amount(txn['amount']) for txn in transactions], dtype=_AMOUNT_DTYPE),
+                pl.Series('confidence', [txn.get('confidence') for txn in transactions], dtype=pl.Float64, strict=False),
+                *(
+                    pl.Series(column, [txn.get(column) for txn in transactions], dtype=pl.Utf8)
+                    for column in text_columns
+                ),
+            ]
+        )
+
+        with self._staged('staged_transactions', staged):
+            self.conn.execute("""
+                INSERT INTO transactions (
+                    id, date, vendor, amount, nominal_code, reference,
+                    details, source, confidence, explanation, assigned_by
+                )
+                SELECT
+                    nextval('seq_transactions'), CAST(date AS DATE), vendor,
+                    -- ROUND first: DuckDB 1.1 truncates when narrowing a DECIMAL
+                    CAST(ROUND(amount, 2) AS DECIMAL(10,2)),
+                    nominal_code, reference, details, source, confidence,
+                    explanation, assigned_by
+                FROM staged_transactions
+            """)
+
+        return len(transactions)
 
     def get_transactions(
         self,
         source: Optional[str] = None,
         reviewed: Optional[bool] = None,
         min_confidence: Optional[float] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        coded: Optional[bool] = None,
+        needs_review_below: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """Get transactions with optional filters."""
-        query = "SELECT * FROM transactions WHERE 1=1"
-        params = []
-
-        if source:
-            query += " AND source = ?"
-            params.append(source)
-
-        if reviewed is not None:
-            query += " AND reviewed = ?"
-            params.append(reviewed)
+        return self.get_transactions_df(
+            source=source,
+            reviewed=reviewed,
+            min_confidence=min_confidence,
+            limit=limit,
+            coded=coded,
+            needs_review_below=needs_review_below
+        ).to_dicts()
+
+    def get_transactions_df(
+        self,
+        source: Optional[str] = None,
+        reviewed: Optional[bool] = None,
+        min_confidence: Optional[float] = None,
+        limit: Optional[int] = None,
+        coded: Optional[bool] = None,
+        needs_review_below: Optional[float] = None
+    ) -> pl.DataFrame:
+        """
+        Get transactions with optional filters as a Polars DataFrame.
 
-        if min_confidence is not None:
-            query += " AND confidence >= ?"
-            params.append(min_confidence)
+        Rows come over DuckDB's Arrow stream, so no Python object is built
+        per row; use this over get_transactions() when working on columns.
+        """
+        rel = self._transactions_relation(
+            source=source,
+            reviewed=reviewed,
+            min_confidence=min_confidence,
+            coded=coded,
+            needs_review_below=needs_review_below
+        )
 
-        query += " ORDER BY created_at DESC"
+        # Rows inserted in one transaction share created_at; id keeps their order
+        rel = rel.order("created_at DESC, id DESC")
 
         # SECURITY FIX: Validate limit is a positive integer
         if limit:
             if not isinstance(limit, int) or limit < 0:
                 raise ValueError(f"Limit must be a positive integer, got: {limit}")
-            query += f" LIMIT {limit}"
+            rel = rel.limit(limit)
+
+        return pl.DataFrame(rel)
+
+    def count_transactions(
+        self,
+        source: Optional[str] = None,
+        reviewed: Optional[bool] = None,
+        min_confidence: Optional[float] = None,
+        coded: Optional[bool] = None,
+        needs_review_below: Optional[float] = None
+    ) -> int:
+        """Count transactions matching the get_transactions() filters."""
+        rel = self._transactions_relation(
+            source=source,
+            reviewed=reviewed,
+            min_confidence=min_confidence,
+            coded=coded,
+            needs_review_below=needs_review_below
+        )
+        return rel.aggregate("COUNT(*)").fetchone()[0]
+
+    def _transactions_relation(
+        self,
+        source: Optional[str] = None,
+        reviewed: Optional[bool] = None,
+        min_confidence: Optional[float] = None,
+        coded: Optional[bool] = None,
+        needs_review_below: Optional[float] = None
+    ) -> duckdb.DuckDBPyRelation:
+        """Lazy relation over transactions with the shared filters applied."""
+        # Filters are bound as constant expressions on a lazy relation;
+        # conn.sql() with parameters would materialize the result up front
+        rel = self.conn.table("transactions")
+
+        if source:
+            rel = rel.filter(ColumnExpression("source") == ConstantExpression(source))
+
+        # Blank or whitespace-only codes count as uncoded
+        if coded is True:
+            rel = rel.filter("nominal_code IS NOT NULL AND TRIM(nominal_code) != ''")
+        elif coded is False:
+            rel = rel.filter("nominal_code IS NULL OR TRIM(nominal_code) = ''")
+
+        if reviewed is not None:
+            rel = rel.filter(ColumnExpression("reviewed") == ConstantExpression(reviewed))
+
+        if min_confidence is not None:
+            rel = rel.filter(ColumnExpression("confidence") >= ConstantExpression(_confidence_bound(min_confidence)))
 
-        result = self.conn.execute(query, params).fetchall()
-        columns = [desc[0] for desc in self.conn.description]
-        return [dict(zip(columns, row)) for row in result]
+        # Unscored or below-threshold confidence needs review
+        if needs_review_below is not None:
+            confidence = ColumnExpression("confidence")
+            bound = ConstantExpression(_confidence_bound(needs_review_below))
+            rel = rel.filter(confidence.isnull() | (confidence < bound))
+
+        return rel
 
     # SECURITY: Whitelist of allowed fields for transaction updates
     ALLOWED_TRANSACTION_UPDATE_FIELDS = {
@@ -175,20 +393,146 @@ class Database:
         'assigned_by', 'reference', 'details'
     }
 
+    def get_transactions_by_ids(self, txn_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get transactions by ID in one query, keyed by ID (missing IDs are absent)."""
+        if not txn_ids:
+            return {}
+
+        rel = self.conn.table("transactions").filter(
+            ColumnExpression("id").isin(*(ConstantExpression(txn_id) for txn_id in set(txn_ids)))
+        )
+        return {row['id']: row for row in pl.DataFrame(rel).to_dicts()}
+
+    def find_transactions_by_vendor(
+        self,
+        vendor_text: str,
+        source: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find transactions whose vendor contains the given text (case-insensitive).
+
+        Args:
+            vendor_text: Text to look for anywhere in the vendor name
+            source: Optional source filter ('history' or 'bank')
+
+        Returns:
+            Dicts with id and vendor, newest first (same order as get_transactions)
+        """
+        rel = self._transactions_relation(source=source).filter(FunctionExpression(
+            "contains",
+            FunctionExpression("lower", ColumnExpression("vendor")),
+            ConstantExpression(vendor_text.lower())
+        ))
+        rel = rel.order("created_at DESC, id DESC").select("id", "vendor")
+        return pl.DataFrame(rel).to_dicts()
+
+    def get_vendor_summary(self, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Summarize transactions per vendor.
+
+        Args:
+            source: Optional source filter ('history' or 'bank')
+
+        Returns:
+            Dicts with vendor, transactions (count) and nominal_code (the
+            vendor's most common non-blank code, or None), by vendor name
+        """
+        rel = self._transactions_relation(source=source).aggregate(
+            "vendor, COUNT(*) AS transactions, mode(NULLIF(TRIM(nominal_code), '')) AS nominal_code",
+            "vendor"
+        )
+        return pl.DataFrame(rel.order("vendor")).to_dicts()
+
     def update_transaction(self, txn_id: int, updates: Dict[str, Any]) -> None:
         """Update a transaction with field validation."""
         if not updates:
             return
 
-        # SECURITY FIX: Validate field names against whitelist
-        invalid_fields = set(updates.keys()) - self.ALLOWED_TRANSACTION_UPDATE_FIELDS
-        if invalid_fields:
-            raise ValueError(f"Invalid update fields: {invalid_fields}")
-
-        set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
-        query = f"UPDATE transactions SET {set_clause} WHERE id = ?"
+        set_clause = self._update_set_clause(tuple(updates))
         params = list(updates.values()) + [txn_id]
-        self.conn.execute(query, params)
+        self.conn.execute(f"UPDATE transactions SET {set_clause} WHERE id = ?", params)
+
+    def update_transactions(self, txn_ids: List[int], updates: Dict[str, Any]) -> None:
+        """Apply the same validated field updates to many transactions in one UPDATE."""
+        if not updates or not txn_ids:
+            return
+
+        set_clause = self._update_set_clause(tuple(updates))
+        params = list(updates.values()) + [list(txn_ids)]
+        self.conn.execute(
+            f"UPDATE transactions SET {set_clause} WHERE id IN (SELECT UNNEST(?))",
+            params
+        )
+
+    def _update_set_clause(self, fields: tuple) -> str:
+        """SET clause for an update of the given fields (validated, then cached)."""
+        # Clauses are cached per field list; only validated ones are stored
+        set_clause = self._update_set_clauses.get(fields)
+        if set_clause is None:
+            # SECURITY FIX: Validate field names against whitelist
+            invalid_fields = set(fields) - self.ALLOWED_TRANSACTION_UPDATE_FIELDS
+            if invalid_fields:
+                raise ValueError(f"Invalid update fields: {invalid_fields}")
+
+            set_clause = ", ".join([f"{k} = ?" for k in fields])
+            self._update_set_clauses[fields] = set_clause
+        return set_clause
+
+    def bulk_update_transaction_reviews(self, rows: List[tuple]) -> int:
+        """
+        Record reviewed coding decisions for many transactions in one UPDATE.
+
+        Args:
+            rows: Tuples of (id, nominal_code, confidence, assigned_by, explanation);
+                  if an id repeats, its last row wins
+
+        Returns:
+            Number of transactions updated
+        """
+        if not rows:
+            return 0
+
+        staged = pl.DataFrame(
+            rows,
+            schema={
+                'id': pl.Int64,
+                'nominal_code': pl.Utf8,
+                'confidence': pl.Float64,
+                'assigned_by': pl.Utf8,
+                'explanation': pl.Utf8
+            },
+            orient='row'
+        ).unique(subset='id', keep='last', maintain_order=True)
+
+        with self.transaction(), self._staged('staged_reviews', staged):
+            self.conn.execute("""
+                UPDATE transactions
+                SET nominal_code = s.nominal_code, confidence = s.confidence,
+                    reviewed = TRUE, assigned_by = s.assigned_by, explanation = s.explanation
+                FROM staged_reviews s
+                WHERE transactions.id = s.id
+            """)
+        return staged.height
+
+    def bulk_update_transaction_codes(self, rows: List[tuple]) -> int:
+        """
+        Apply classifier coding results in a single transaction.
+
+        Args:
+            rows: Tuples of (nominal_code, confidence, explanation, assigned_by, id)
+
+        Returns:
+            Number of rows submitted
+        """
+        if not rows:
+            return 0
+
+        self._executemany_in_transaction("""
+            UPDATE transactions
+            SET nominal_code = ?, confidence = ?, explanation = ?, assigned_by = ?
+            WHERE id = ?
+        """, rows)
+        return len(rows)
 
     # Rule operations
     def insert_rule(self, rule: Dict[str, Any]) -> int:
@@ -211,20 +555,58 @@ class Database:
         ]).fetchone()
         return result[0]
 
+    def insert_rules(self, rules: List[Dict[str, Any]]) -> List[int]:
+        """Insert rules in one statement and return their IDs, in order."""
+        if not rules:
+            return []
+
+        with self.transaction():
+            # IDs are reserved up front so callers can link to each rule
+            rule_ids = self._next_ids('seq_rules', len(rules))
+            staged = pl.DataFrame({
+                'id': pl.Series(rule_ids, dtype=pl.Int64),
+                'vendor_pattern': pl.Series([rule['vendor_pattern'] for rule in rules], dtype=pl.Utf8),
+                'nominal_code': pl.Series([rule['nominal_code'] for rule in rules], dtype=pl.Utf8),
+                'rule_type': pl.Series([rule['rule_type'] for rule in rules], dtype=pl.Utf8),
+                'confidence': pl.Series([rule['confidence'] for rule in rules], dtype=pl.Float64, strict=False),
+                'created_by': pl.Series([rule.get('created_by') for rule in rules], dtype=pl.Utf8)
+            })
+            with self._staged('staged_rules', staged):
+                self.conn.execute("""
+                    INSERT INTO rules (
+                        id, vendor_pattern, nominal_code, rule_type,
+                        confidence, created_by
+                    )
+                    SELECT id, vendor_pattern, nominal_code, rule_type, confidence, created_by
+                    FROM staged_rules
+                """)
+        return rule_ids
+
     def get_rules(self, min_confidence: Optional[float] = None) -> List[Dict[str, Any]]:
         """Get all rules, optionally filtered by confidence."""
-        query = "SELECT * FROM rules WHERE 1=1"
-        params = []
+        return pl.DataFrame(self._rules_relation(min_confidence)).to_dicts()
 
-        if min_confidence:
-            query += " AND confidence >= ?"
-            params.append(min_confidence)
+    def get_rules_for_display(self, min_confidence: Optional[float] = None) -> List[tuple]:
+        """
+        Get rules as rows of display strings, in get_rules() order.
+
+        Columns: id, vendor_pattern, nominal_code, rule_type, confidence
+        (as a percentage, e.g. "85.0%") and match_count. Formatting runs in
+        DuckDB, so listing many rules needs no per-row Python work.
+        """
+        return self._rules_relation(min_confidence).project("""
+            CAST(id AS VARCHAR), vendor_pattern, nominal_code, rule_type,
+            printf('%.1f%%', confidence * 100), CAST(match_count AS VARCHAR)
+        """).fetchall()
+
+    def _rules_relation(self, min_confidence: Optional[float] = None) -> duckdb.DuckDBPyRelation:
+        """Lazy relation over rules, best first, optionally filtered by confidence."""
+        rel = self.conn.table("rules")
 
-        query += " ORDER BY confidence DESC, match_count DESC"
+        if min_confidence:
+            rel = rel.filter(ColumnExpression("confidence") >= ConstantExpression(_confidence_bound(min_confidence)))
 
-        result = self.conn.execute(query, params).fetchall()
-        columns = [desc[0] for desc in self.conn.description]
-        return [dict(zip(columns, row)) for row in result]
+        return rel.order("confidence DESC, match_count DESC")
 
     def update_rule_stats(self, rule_id: int):
         """Update rule usage statistics."""
@@ -235,10 +617,96 @@ class Database:
             WHERE id = ?
         """, [rule_id])
 
+    def bulk_update_rule_stats(self, match_counts: Dict[int, int]):
+        """Increment usage statistics for many rules in a single transaction."""
+        if not match_counts:
+            return
+
+        self._executemany_in_transaction("""
+            UPDATE rules
+            SET match_count = match_count + ?,
+                last_used = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, [[count, rule_id] for rule_id, count in match_counts.items()])
+
     def delete_rule(self, rule_id: int):
         """Delete a rule."""
         self.conn.execute("DELETE FROM rules WHERE id = ?", [rule_id])
 
+    # Classifier match cache operations
+    MATCH_CACHE_MAX_ENTRIES = 50_000
+
+    def get_match_cache(self, vendors: List[str]) -> Dict[str, tuple]:
+        """
+        Look up cached classifier results for normalized vendors.
+
+        Entries computed against a different rule table are deleted first,
+        so a rule added, edited or removed by any means is never served
+        from a stale match.
+
+        Returns:
+            Dict of vendor_norm -> (rule_id, confidence, explanation)
+        """
+        if not vendors:
+            return {}
+
+        self.conn.execute("""
+            DELETE FROM classifier_match_cache
+            WHERE rules_fingerprint IS DISTINCT FROM ?
+        """, [self._rules_fingerprint()])
+
+        result = self.conn.execute("""
+            SELECT vendor_norm, rule_id, confidence, explanation
+            FROM classifier_match_cache
+            WHERE vendor_norm IN (SELECT UNNEST(?::VARCHAR[]))
+        """, [vendors]).fetchall()
+        return {row[0]: row[1:] for row in result}
+
+    def upsert_match_cache(self, rows: List[tuple]):
+        """
+        Store classifier results, evicting the oldest entries over the size cap.
+
+        Results are stamped with the current rule table fingerprint.
+
+        Args:
+            rows: Tuples of (vendor_norm, rule_id, confidence, explanation)
+        """
+        if not rows:
+            return
+
+        fingerprint = self._rules_fingerprint()
+        self._executemany_in_transaction("""
+            INSERT OR REPLACE INTO classifier_match_cache (
+                vendor_norm, rule_id, confidence, explanation, computed_at, rules_fingerprint
+            )
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
+        """, [(*row, fingerprint) for row in rows])
+
+        self.conn.execute("""
+            DELETE FROM classifier_match_cache
+            WHERE vendor_norm IN (
+                SELECT vendor_norm FROM classifier_match_cache
+                ORDER BY computed_at DESC
+                OFFSET ?
+            )
+        """, [self.MATCH_CACHE_MAX_ENTRIES])
+
+    def _rules_fingerprint(self) -> str:
+        """
+        Summary of the rule table that changes whenever a rule does.
+
+        Row count, highest id and a checksum over the columns matching
+        depends on. match_count and last_used are left out, since every
+        classifier run updates them.
+        """
+        count, max_id, checksum = self.conn.execute("""
+            SELECT
+                COUNT(*), MAX(id),
+                bit_xor(hash(id, vendor_pattern, nominal_code, rule_type, confidence))
+            FROM rules
+        """).fetchone()
+        return f"{count}:{max_id}:{checksum}"
+
     # Override operations
     def insert_override(self, override: Dict[str, Any]) -> int:
         """Insert an override record."""
@@ -259,6 +727,30 @@ class Database:
         ]).fetchone()
         return result[0]
 
+    def bulk_insert_overrides(self, overrides: List[Dict[str, Any]]) -> int:
+        """Insert multiple override records in one statement."""
+        if not overrides:
+            return 0
+
+        staged = pl.DataFrame({
+            'transaction_id': pl.Series([o['transaction_id'] for o in overrides], dtype=pl.Int64),
+            'original_code': pl.Series([o['original_code'] for o in overrides], dtype=pl.Utf8),
+            'corrected_code': pl.Series([o['corrected_code'] for o in overrides], dtype=pl.Utf8),
+            'created_rule_id': pl.Series([o.get('created_rule_id') for o in overrides], dtype=pl.Int64)
+        })
+        with self._staged('staged_overrides', staged):
+            self.conn.execute("""
+                INSERT INTO overrides (
+                    id, transaction_id, original_code,
+                    corrected_code, created_rule_id
+                )
+                SELECT
+                    nextval('seq_overrides'), transaction_id, original_code,
+                    corrected_code, created_rule_id
+                FROM staged_overrides
+            """)
+        return len(overrides)
+
     # Agent logging
     def log_agent_action(
         self,
@@ -285,68 +777,61 @@ class Database:
         if not isinstance(limit, int) or limit < 0:
             raise ValueError(f"Limit must be a positive integer, got: {limit}")
 
-        query = "SELECT * FROM agent_logs WHERE 1=1"
-        params = []
+        rel = self.conn.table("agent_logs")
 
         if agent_name:
-            query += " AND agent_name = ?"
-            params.append(agent_name)
+            rel = rel.filter(ColumnExpression("agent_name") == ConstantExpression(agent_name))
 
-        query += f" ORDER BY created_at DESC LIMIT {limit}"
+        rel = rel.order("created_at DESC").limit(limit)
 
-        result = self.conn.execute(query, params).fetchall()
-        columns = [desc[0] for desc in self.conn.description]
-        return [dict(zip(columns, row)) for row in result]
+        return pl.DataFrame(rel).to_dicts()
 
     # Statistics
     def get_stats(self) -> Dict[str, Any]:
         """Get workspace statistics."""
-        stats = {}
-
-        # Transaction counts
+        # Transaction, rule and override aggregates in a single round-trip
         result = self.conn.execute("""
             SELECT
-                COUNT(*) as total,
-                COUNT(CASE WHEN source = 'history' THEN 1 END) as history,
-                COUNT(CASE WHEN source = 'bank' THEN 1 END) as bank,
-                COUNT(CASE WHEN reviewed = TRUE THEN 1 END) as reviewed,
-                COUNT(CASE WHEN nominal_code IS NOT NULL THEN 1 END) as coded,
-                AVG(CASE WHEN confidence IS NOT NULL THEN confidence END) as avg_confidence
-            FROM transactions
+                t.total, t.history, t.bank, t.reviewed, t.coded, t.avg_confidence,
+                r.total, r.learned, r.manual, r.avg_confidence,
+                (SELECT COUNT(*) FROM overrides)
+            FROM (
+                SELECT
+                    COUNT(*) AS total,
+                    COUNT(*) FILTER (WHERE source = 'history') AS history,
+                    COUNT(*) FILTER (WHERE source = 'bank') AS bank,
+                    COUNT(*) FILTER (WHERE reviewed = TRUE) AS reviewed,
+                    COUNT(*) FILTER (WHERE nominal_code IS NOT NULL) AS coded,
+                    AVG(confidence) AS avg_confidence
+                FROM transactions
+            ) t, (
+                SELECT
+                    COUNT(*) AS total,
+                    COUNT(*) FILTER (WHERE created_by = 'learner') AS learned,
+                    COUNT(*) FILTER (WHERE created_by = 'reviewer') AS manual,
+                    AVG(confidence) AS avg_confidence
+                FROM rules
+            ) r
         """).fetchone()
 
-        stats['transactions'] = {
-            'total': result[0],
-            'history': result[1],
-            'bank': result[2],
-            'reviewed': result[3],
-            'coded': result[4],
-            'avg_confidence': round(result[5], 2) if result[5] else 0.0
+        return {
+            'transactions': {
+                'total': result[0],
+                'history': result[1],
+                'bank': result[2],
+                'reviewed': result[3],
+                'coded': result[4],
+                'avg_confidence': round(result[5], 2) if result[5] else 0.0
+            },
+            'rules': {
+                'total': result[6],
+                'learned': result[7],
+                'manual': result[8],
+                'avg_confidence': round(result[9], 2) if result[9] else 0.0
+            },
+            'overrides': result[10]
         }
 
-        # Rule counts
-        result = self.conn.execute("""
-            SELECT
-                COUNT(*) as total,
-                COUNT(CASE WHEN created_by = 'learner' THEN 1 END) as learned,
-                COUNT(CASE WHEN created_by = 'reviewer' THEN 1 END) as manual,
-                AVG(confidence) as avg_confidence
-            FROM rules
-        """).fetchone()
-
-        stats['rules'] = {
-            'total': result[0],
-            'learned': result[1],
-            'manual': result[2],
-            'avg_confidence': round(result[3], 2) if result[3] else 0.0
-        }
-
-        # Override count
-        override_count = self.conn.execute("SELECT COUNT(*) FROM overrides").fetchone()[0]
-        stats['overrides'] = override_count
-
-        return stats
-
     def close(self):
         """Close database connection."""
         self.conn.close()
@@ -358,3 +843,18 @@ class Database:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.close()
+
+
+@contextmanager
+def open_database(db_path: Path, db: Optional[Database] = None) -> Iterator[Database]:
+    """
+    Use a shared database if one is given, else open db_path for the block.
+
+    A shared database is left open for its owner to close.
+    """
+    if db is not None:
+        yield db
+        return
+
+    with Database(str(db_path)) as opened:
+        yield opened
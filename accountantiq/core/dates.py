@@ -0,0 +1,30 @@
+"""
+Date helpers shared by AccountantIQ agents.
+"""
+
+from datetime import date
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_iso_date(value: str) -> date:
+    """
+    Parse a 'YYYY-MM-DD' string without going through strptime.
+
+    Statements repeat the same few hundred dates, so results are cached.
+
+    Args:
+        value: ISO date string
+
+    Returns:
+        Parsed date
+
+    Raises:
+        ValueError: If value is not a valid 'YYYY-MM-DD' date
+    """
+    if (
+        len(value) != 10 or value[4] != '-' or value[7] != '-'
+        or not (value[0:4] + value[5:7] + value[8:10]).isdigit()
+    ):
+        raise ValueError(f"Invalid ISO date: {value!r}")
+    return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
@@ -3,15 +3,18 @@ Pydantic models for AccountantIQ data validation.
 Used across all agents for consistent data structures.
 """
 
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Literal
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_serializer, field_validator
+from typing import Any, Dict, List, Optional, Literal
 from datetime import date, datetime
 from decimal import Decimal
+from typing_extensions import NotRequired, TypedDict
 
 
 class Transaction(BaseModel):
     """Transaction model used across all agents."""
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     id: Optional[int] = None
     date: date
     vendor: str = Field(min_length=1)
@@ -26,6 +29,8 @@ class Transaction(BaseModel):
     assigned_by: Optional[str] = None  # Agent name that coded this
     created_at: Optional[datetime] = None
 
+    # source (Literal) and confidence (ge/le) are checked in pydantic-core;
+    # it has no not-equal constraint, so the zero check stays in Python
     @field_validator('amount')
     @classmethod
     def validate_amount(cls, v):
@@ -34,33 +39,68 @@ class Transaction(BaseModel):
             raise ValueError("Amount cannot be zero")
         return v
 
-    @field_validator('source')
-    @classmethod
-    def validate_source(cls, v):
-        """Validate source is either 'history' or 'bank'."""
-        if v not in ["history", "bank"]:
-            raise ValueError("Source must be 'history' or 'bank'")
-        return v
+    @field_serializer('amount', 'confidence', when_used='json')
+    def serialize_decimal(self, v: Optional[Decimal]) -> Optional[float]:
+        """Serialize Decimals as floats for DuckDB."""
+        return float(v) if v is not None else None
 
     def to_dict(self) -> dict:
         """Convert to dictionary for database insertion."""
-        data = self.model_dump()
-        # Convert date and datetime to strings for DuckDB
-        if data.get('date'):
-            data['date'] = data['date'].isoformat()
-        if data.get('created_at'):
-            data['created_at'] = data['created_at'].isoformat()
-        # Convert Decimal to float for DuckDB
-        if data.get('amount'):
-            data['amount'] = float(data['amount'])
-        if data.get('confidence'):
-            data['confidence'] = float(data['confidence'])
-        return data
+        # JSON mode renders dates as ISO strings; the amount stays an exact
+        # Decimal, as insert_transactions_bulk stages it
+        return {**self.model_dump(mode='json'), 'amount': self.amount}
+
+    @classmethod
+    def validate_many(cls, rows: List[Dict[str, Any]]) -> List["Transaction"]:
+        """Validate a list of transaction dicts in one call to the core validator."""
+        return TRANSACTION_LIST_ADAPTER.validate_python(rows)
+
+    @classmethod
+    def fast_dict(
+        cls,
+        date: date,
+        vendor: str,
+        amount: Decimal,
+        source: str,
+        nominal_code: Optional[str] = None,
+        reference: Optional[str] = None,
+        details: Optional[str] = None,
+        confidence: Optional[float] = None,
+        assigned_by: Optional[str] = None
+    ) -> dict:
+        """
+        Build a transaction dict for database insertion without model validation.
+
+        Returns the same shape as to_dict(), with the amount kept as the
+        exact Decimal given. Only for bulk paths (the parsers) that already
+        enforce the model's constraints on every field.
+        """
+        return {
+            'id': None,
+            'date': date.isoformat(),
+            'vendor': vendor,
+            'amount': amount,
+            'nominal_code': nominal_code,
+            'reference': reference,
+            'details': details,
+            'source': source,
+            'confidence': float(confidence) if confidence is not None else None,
+            'explanation': None,
+            'reviewed': False,
+            'assigned_by': assigned_by,
+            'created_at': None
+        }
+
+
+# Built once; reused by Transaction.validate_many
+TRANSACTION_LIST_ADAPTER = TypeAdapter(List[Transaction])
 
 
 class Rule(BaseModel):
     """Rule model for vendor pattern matching."""
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     id: Optional[int] = None
     vendor_pattern: str = Field(min_length=1)
     nominal_code: str = Field(min_length=1)
@@ -71,29 +111,50 @@ class Rule(BaseModel):
     created_at: Optional[datetime] = None
     last_used: Optional[datetime] = None
 
-    @field_validator('confidence')
-    @classmethod
-    def validate_confidence(cls, v):
-        """Ensure confidence is between 0 and 1."""
-        if not (0 <= v <= 1):
-            raise ValueError("Confidence must be between 0 and 1")
-        return v
+    @field_serializer('confidence', when_used='json')
+    def serialize_confidence(self, v: Decimal) -> float:
+        """Serialize confidence as a float for DuckDB."""
+        return float(v)
 
     def to_dict(self) -> dict:
         """Convert to dictionary for database insertion."""
-        data = self.model_dump()
-        if data.get('confidence'):
-            data['confidence'] = float(data['confidence'])
-        if data.get('created_at'):
-            data['created_at'] = data['created_at'].isoformat()
-        if data.get('last_used'):
-            data['last_used'] = data['last_used'].isoformat()
-        return data
+        return self.model_dump(mode='json')
+
+    @classmethod
+    def fast_dict(
+        cls,
+        vendor_pattern: str,
+        nominal_code: str,
+        rule_type: str,
+        confidence: float,
+        match_count: int = 0,
+        created_by: Optional[str] = None
+    ) -> dict:
+        """
+        Build a rule dict for database insertion without model validation.
+
+        Only for bulk paths where every field is computed internally;
+        external input should go through the model so validators run.
+        Confidence is rounded to the 2 decimal places the schema stores.
+        """
+        return {
+            'id': None,
+            'vendor_pattern': vendor_pattern,
+            'nominal_code': nominal_code,
+            'rule_type': rule_type,
+            'confidence': round(float(confidence), 2),
+            'match_count': match_count,
+            'created_by': created_by,
+            'created_at': None,
+            'last_used': None
+        }
 
 
 class Override(BaseModel):
     """Override record when user corrects a transaction."""
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     id: Optional[int] = None
     transaction_id: int
     original_code: str
@@ -103,15 +164,14 @@ class Override(BaseModel):
 
     def to_dict(self) -> dict:
         """Convert to dictionary for database insertion."""
-        data = self.model_dump()
-        if data.get('created_at'):
-            data['created_at'] = data['created_at'].isoformat()
-        return data
+        return self.model_dump(mode='json')
 
 
 class AgentResult(BaseModel):
     """Standard result format returned by all agents."""
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     agent: str
     status: Literal["complete", "error", "partial"]
     stats: dict = Field(default_factory=dict)
@@ -121,14 +181,62 @@ class AgentResult(BaseModel):
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return self.model_dump()
+        return self.model_dump(mode='json')
+
+
+# Typed stats for each agent's result. They stay plain dicts for callers,
+# but pydantic-core validates them against a fixed schema instead of
+# treating them as arbitrary dicts.
+
+class ParserStats(TypedDict):
+    """Stats reported by the parser agent."""
+
+    rows_parsed: int
+    rows_inserted: int
+    errors: int
+
+
+class LearnerStats(TypedDict):
+    """Stats reported by the learner agent."""
+
+    historical_transactions: int
+    rules_generated: int
+    smart_rules: NotRequired[int]
+    basic_rules: NotRequired[int]
+    unique_vendors: int
+    avg_confidence: float
+
+
+class ClassifierStats(TypedDict):
+    """Stats reported by the classifier agent."""
+
+    processed: int
+    auto_coded: int
+    exceptions: int
+    avg_confidence: float
+
+
+class ReviewerStats(TypedDict):
+    """Stats reported by the reviewer agent."""
+
+    reviewed: int
+    approved: int
+    overridden: int
+    new_rules_created: int
+
+
+class ExporterStats(TypedDict):
+    """Stats reported by the exporter agent."""
+
+    transactions_exported: int
+    output_file: Optional[str]
 
 
 class ParserResult(AgentResult):
     """Result from parser agent."""
 
     agent: Literal["parser"] = "parser"
-    stats: dict = Field(default_factory=lambda: {
+    stats: ParserStats = Field(default_factory=lambda: {
         "rows_parsed": 0,
         "rows_inserted": 0,
         "errors": 0
@@ -139,7 +247,7 @@ class LearnerResult(AgentResult):
     """Result from learner agent."""
 
     agent: Literal["learner"] = "learner"
-    stats: dict = Field(default_factory=lambda: {
+    stats: LearnerStats = Field(default_factory=lambda: {
         "historical_transactions": 0,
         "rules_generated": 0,
         "unique_vendors": 0,
@@ -151,7 +259,7 @@ class ClassifierResult(AgentResult):
     """Result from classifier agent."""
 
     agent: Literal["classifier"] = "classifier"
-    stats: dict = Field(default_factory=lambda: {
+    stats: ClassifierStats = Field(default_factory=lambda: {
         "processed": 0,
         "auto_coded": 0,
         "exceptions": 0,
@@ -163,7 +271,7 @@ class ReviewerResult(AgentResult):
     """Result from reviewer agent."""
 
     agent: Literal["reviewer"] = "reviewer"
-    stats: dict = Field(default_factory=lambda: {
+    stats: ReviewerStats = Field(default_factory=lambda: {
         "reviewed": 0,
         "approved": 0,
         "overridden": 0,
@@ -175,7 +283,7 @@ class ExporterResult(AgentResult):
     """Result from exporter agent."""
 
     agent: Literal["exporter"] = "exporter"
-    stats: dict = Field(default_factory=lambda: {
+    stats: ExporterStats = Field(default_factory=lambda: {
         "transactions_exported": 0,
         "output_file": None
     })
@@ -192,15 +300,11 @@ class WorkspaceConfig(BaseModel):
     default_confidence_threshold: Decimal = Field(default=Decimal("0.70"), ge=0, le=1)
     min_rule_confidence: Decimal = Field(default=Decimal("0.75"), ge=0, le=1)
 
+    @field_serializer('default_confidence_threshold', 'min_rule_confidence', when_used='json')
+    def serialize_threshold(self, v: Decimal) -> float:
+        """Serialize thresholds as floats."""
+        return float(v)
+
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        data = self.model_dump()
-        if data.get('created_at'):
-            data['created_at'] = data['created_at'].isoformat()
-        if data.get('last_modified'):
-            data['last_modified'] = data['last_modified'].isoformat()
-        if data.get('default_confidence_threshold'):
-            data['default_confidence_threshold'] = float(data['default_confidence_threshold'])
-        if data.get('min_rule_confidence'):
-            data['min_rule_confidence'] = float(data['min_rule_confidence'])
-        return data
+        return self.model_dump(mode='json')
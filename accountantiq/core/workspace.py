@@ -3,14 +3,18 @@ Workspace management for AccountantIQ multi-agent system.
 Handles workspace creation, configuration, and state management.
 """
 
-import json
+import os
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime
 
 from accountantiq.core.models import WorkspaceConfig
 from accountantiq.core.database import Database
 
+# A bare file name: no path separators (either platform's) and no leading dot
+_SAFE_NAME_RE = re.compile(r'[^./\\][^/\\]*')
+
 
 class Workspace:
     """Manages workspace directory structure and configuration."""
@@ -33,9 +37,15 @@ class Workspace:
         self.config_file = self.workspace_path / "config.json"
         self.db_file = self.workspace_path / "accountant.db"
 
+        # Parsed config and the (mtime_ns, size) of the file it came from
+        self._config_cache: Optional[WorkspaceConfig] = None
+        self._config_stamp: Optional[Tuple[int, int]] = None
+
     def exists(self) -> bool:
         """Check if workspace exists."""
-        return self.workspace_path.exists() and self.config_file.exists()
+        # Checked on every call, so a workspace deleted elsewhere is noticed;
+        # config.json implies the directory
+        return self.config_file.exists()
 
     def create(self, overwrite: bool = False) -> "Workspace":
         """
@@ -88,13 +98,19 @@ class Workspace:
         if not self.config_file.exists():
             raise ValueError(f"Workspace '{self.workspace_name}' not initialized")
 
-        with open(self.config_file, 'r') as f:
-            config_data = json.load(f)
+        # Reuse the parsed config while the file is unchanged on disk
+        stamp = self._config_file_stamp()
+        if self._config_cache is None or stamp != self._config_stamp:
+            # Parsed and validated in one pass, without an intermediate dict
+            self._config_cache = WorkspaceConfig.model_validate_json(self.config_file.read_bytes())
+            self._config_stamp = stamp
 
-        return WorkspaceConfig(**config_data)
+        # A copy, so callers changing it can't alter the cache without saving
+        return self._config_cache.model_copy(deep=True)
 
     def update_config(self, **kwargs):
         """Update workspace configuration."""
+        # Edits a copy; the cache only changes once _save_config has written it
         config = self.get_config()
 
         # Update fields
@@ -107,8 +123,14 @@ class Workspace:
 
     def _save_config(self, config: WorkspaceConfig):
         """Save configuration to file."""
-        with open(self.config_file, 'w') as f:
-            json.dump(config.to_dict(), f, indent=2, default=str)
+        self.config_file.write_bytes(config.model_dump_json(indent=2).encode())
+        self._config_cache = config
+        self._config_stamp = self._config_file_stamp()
+
+    def _config_file_stamp(self) -> Tuple[int, int]:
+        """Modification time and size of the config file, to detect changes."""
+        stat = self.config_file.stat()
+        return (stat.st_mtime_ns, stat.st_size)
 
     def get_database(self) -> Database:
         """Get database connection for this workspace."""
@@ -132,18 +154,16 @@ class Workspace:
         if not filename:
             raise ValueError("Filename cannot be empty")
 
-        # SECURITY FIX: Extract only the filename component (no path traversal)
-        safe_name = Path(filename).name
+        # SECURITY FIX: Accept only a bare name (no path traversal); the
+        # slower checks below just pick the error message
+        if _SAFE_NAME_RE.fullmatch(filename):
+            return filename
 
-        # Ensure the filename didn't contain any path components
-        if safe_name != filename or not safe_name:
+        if filename == '.' or '/' in filename or '\\' in filename:
             raise ValueError(f"Invalid filename (contains path components): {filename}")
 
         # Prevent hidden files
-        if safe_name.startswith('.'):
-            raise ValueError(f"Filename cannot start with dot: {filename}")
-
-        return safe_name
+        raise ValueError(f"Filename cannot start with dot: {filename}")
 
     def get_export_path(self, filename: str) -> Path:
         """Get path for export file with path traversal protection."""
@@ -206,10 +226,12 @@ class WorkspaceManager:
 
     def list_workspaces(self) -> list[str]:
         """List all available workspaces."""
+        # scandir entries know their own type, so only config.json is stat'ed
         workspaces = []
-        for path in self.base_path.iterdir():
-            if path.is_dir() and (path / "config.json").exists():
-                workspaces.append(path.name)
+        with os.scandir(self.base_path) as entries:
+            for entry in entries:
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, "config.json")):
+                    workspaces.append(entry.name)
         return sorted(workspaces)
 
     def get_workspace(self, name: str) -> Workspace:
@@ -4,20 +4,19 @@ Coordinates the workflow between all 5 agents.
 """
 
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Type, TypeVar
 from rich.console import Console
-from rich.table import Table
 
 from accountantiq.core.workspace import Workspace
 from accountantiq.core.database import Database
-from accountantiq.agents.parser_agent.parser_agent import ParserAgent
-from accountantiq.agents.learner_agent.learner_agent import LearnerAgent
-from accountantiq.agents.classifier_agent.classifier_agent import ClassifierAgent
-from accountantiq.agents.reviewer_agent.reviewer_agent import ReviewerAgent
-from accountantiq.agents.exporter_agent.exporter_agent import ExporterAgent
+
+# Agents (and rich.table) are imported by the methods that use them, so
+# commands like stats don't load every agent and its dependencies
 
 console = Console()
 
+AgentT = TypeVar("AgentT")
+
 
 class AccountantOrchestrator:
     """Orchestrates multi-agent workflow for auto-coding transactions."""
@@ -41,6 +40,30 @@ class AccountantOrchestrator:
 
         self.workspace_path = str(self.workspace.workspace_path)
 
+        # Open database and agent instances, shared while used as a context
+        # manager (see __enter__); outside one, each operation opens its own
+        self._db: Optional[Database] = None
+        self._agents: Dict[type, Any] = {}
+
+    def __enter__(self) -> "AccountantOrchestrator":
+        """Open one database connection shared by every agent until exit."""
+        self._db = self.workspace.get_database()
+        self._agents.clear()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close the shared connection."""
+        self._agents.clear()
+        self._db.close()
+        self._db = None
+
+    def _agent(self, agent_cls: Type[AgentT]) -> AgentT:
+        """Agent of the given class, created once and bound to the shared database."""
+        agent = self._agents.get(agent_cls)
+        if agent is None:
+            agent = self._agents[agent_cls] = agent_cls(self.workspace_path, db=self._db)
+        return agent
+
     def run_full_pipeline(
         self,
         sage_file: Optional[str] = None,
@@ -68,6 +91,26 @@ class AccountantOrchestrator:
         Returns:
             Dict with pipeline results and statistics
         """
+        # One connection shared by every phase instead of one per agent
+        if self._db is not None:
+            return self._run_pipeline(sage_file, bank_file, output_file, interactive_review)
+        with self:
+            return self._run_pipeline(sage_file, bank_file, output_file, interactive_review)
+
+    def _run_pipeline(
+        self,
+        sage_file: Optional[str],
+        bank_file: Optional[str],
+        output_file: str,
+        interactive_review: bool
+    ) -> Dict[str, Any]:
+        """Run the pipeline phases (see run_full_pipeline)."""
+        from accountantiq.agents.parser_agent.parser_agent import ParserAgent
+        from accountantiq.agents.learner_agent.learner_agent import LearnerAgent
+        from accountantiq.agents.classifier_agent.classifier_agent import ClassifierAgent
+        from accountantiq.agents.reviewer_agent.reviewer_agent import ReviewerAgent
+        from accountantiq.agents.exporter_agent.exporter_agent import ExporterAgent
+
         results = {}
 
         console.print("\n[bold blue]🤖 AccountantIQ Multi-Agent Pipeline[/bold blue]\n")
@@ -75,7 +118,7 @@ class AccountantOrchestrator:
         # Phase 1: Parse Sage historical data
         if sage_file:
             console.print("[cyan]Phase 1:[/cyan] Parsing Sage historical data...")
-            parser = ParserAgent(self.workspace_path)
+            parser = self._agent(ParserAgent)
             result = parser.run(sage_file, "sage")
             results['parse_sage'] = result.to_dict()
 
@@ -89,7 +132,7 @@ class AccountantOrchestrator:
 
             # Phase 2: Learn patterns
             console.print("[cyan]Phase 2:[/cyan] Learning vendor patterns...")
-            learner = LearnerAgent(self.workspace_path)
+            learner = self._agent(LearnerAgent)
             result = learner.run()
             results['learn'] = result.to_dict()
 
@@ -105,7 +148,7 @@ class AccountantOrchestrator:
         # Phase 3: Parse bank statement
         if bank_file:
             console.print("[cyan]Phase 3:[/cyan] Parsing bank statement...")
-            parser = ParserAgent(self.workspace_path)
+            parser = self._agent(ParserAgent)
             result = parser.run(bank_file, "bank")
             results['parse_bank'] = result.to_dict()
 
@@ -119,7 +162,7 @@ class AccountantOrchestrator:
 
             # Phase 4: Classify transactions
             console.print("[cyan]Phase 4:[/cyan] Auto-coding transactions...")
-            classifier = ClassifierAgent(self.workspace_path)
+            classifier = self._agent(ClassifierAgent)
             result = classifier.run()
             results['classify'] = result.to_dict()
 
@@ -137,7 +180,7 @@ class AccountantOrchestrator:
                 console.print(
                     f"[cyan]Phase 5:[/cyan] Reviewing {result.stats['exceptions']} exceptions..."
                 )
-                reviewer = ReviewerAgent(self.workspace_path)
+                reviewer = self._agent(ReviewerAgent)
                 result = reviewer.run(interactive=interactive_review)
                 results['review'] = result.to_dict()
 
@@ -153,7 +196,7 @@ class AccountantOrchestrator:
 
             # Phase 6: Export
             console.print("[cyan]Phase 6:[/cyan] Generating Sage import file...")
-            exporter = ExporterAgent(self.workspace_path)
+            exporter = self._agent(ExporterAgent)
             result = exporter.run(output_filename=output_file)
             results['export'] = result.to_dict()
 
@@ -172,11 +215,15 @@ class AccountantOrchestrator:
 
     def get_workspace_stats(self) -> Dict[str, Any]:
         """Get workspace statistics."""
+        if self._db is not None:
+            return self._db.get_stats()
         with self.workspace.get_database() as db:
             return db.get_stats()
 
     def display_stats(self):
         """Display workspace statistics in a formatted table."""
+        from rich.table import Table
+
         stats = self.get_workspace_stats()
 
         # Transactions table
@@ -184,14 +231,8 @@ class AccountantOrchestrator:
         txn_table.add_column("Metric", style="cyan")
         txn_table.add_column("Count", style="green")
 
-        for key, value in stats['transactions'].items():
-            if key != 'avg_confidence':
-                txn_table.add_row(key.replace('_', ' ').title(), str(value))
-            else:
-                txn_table.add_row(
-                    "Avg Confidence",
-                    f"{value:.1%}" if isinstance(value, float) else str(value)
-                )
+        for row in self._format_stats_rows(stats['transactions']):
+            txn_table.add_row(*row)
 
         console.print(txn_table)
 
@@ -200,45 +241,64 @@ class AccountantOrchestrator:
         rules_table.add_column("Metric", style="cyan")
         rules_table.add_column("Count", style="green")
 
-        for key, value in stats['rules'].items():
-            if key != 'avg_confidence':
-                rules_table.add_row(key.replace('_', ' ').title(), str(value))
-            else:
-                rules_table.add_row(
-                    "Avg Confidence",
-                    f"{value:.1%}" if isinstance(value, float) else str(value)
-                )
+        for row in self._format_stats_rows(stats['rules']):
+            rules_table.add_row(*row)
 
         console.print(rules_table)
         console.print(f"\n[cyan]Overrides:[/cyan] {stats['overrides']}")
 
+    @staticmethod
+    def _format_stats_rows(stats: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(label, value) table rows for a stats section, in dict order."""
+        rows = []
+        for key, value in stats.items():
+            # Only avg_confidence is shown as a percentage
+            if key == 'avg_confidence' and isinstance(value, float):
+                text = f"{value:.1%}"
+            else:
+                text = str(value)
+            rows.append((key.replace('_', ' ').title(), text))
+        return rows
+
     # Individual agent operations
     def parse_sage(self, file_path: str):
         """Parse Sage historical data."""
-        agent = ParserAgent(self.workspace_path)
+        from accountantiq.agents.parser_agent.parser_agent import ParserAgent
+
+        agent = self._agent(ParserAgent)
         return agent.run(file_path, "sage")
 
     def parse_bank(self, file_path: str):
         """Parse bank statement."""
-        agent = ParserAgent(self.workspace_path)
+        from accountantiq.agents.parser_agent.parser_agent import ParserAgent
+
+        agent = self._agent(ParserAgent)
         return agent.run(file_path, "bank")
 
     def learn_patterns(self, min_confidence: float = 0.75):
         """Learn patterns from historical data."""
-        agent = LearnerAgent(self.workspace_path)
+        from accountantiq.agents.learner_agent.learner_agent import LearnerAgent
+
+        agent = self._agent(LearnerAgent)
         return agent.run(min_confidence=min_confidence)
 
     def classify_transactions(self, confidence_threshold: float = 0.70):
         """Classify transactions."""
-        agent = ClassifierAgent(self.workspace_path)
+        from accountantiq.agents.classifier_agent.classifier_agent import ClassifierAgent
+
+        agent = self._agent(ClassifierAgent)
         return agent.run(confidence_threshold=confidence_threshold)
 
     def review_exceptions(self, interactive: bool = True):
         """Review exception transactions."""
-        agent = ReviewerAgent(self.workspace_path)
+        from accountantiq.agents.reviewer_agent.reviewer_agent import ReviewerAgent
+
+        agent = self._agent(ReviewerAgent)
         return agent.run(interactive=interactive)
 
     def export_transactions(self, output_filename: str = "sage_import.csv"):
         """Export coded transactions."""
-        agent = ExporterAgent(self.workspace_path)
+        from accountantiq.agents.exporter_agent.exporter_agent import ExporterAgent
+
+        agent = self._agent(ExporterAgent)
         return agent.run(output_filename=output_filename)
@@ -0,0 +1,56 @@
+"""
+Shared fixtures for the AccountantIQ test suite.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from accountantiq.core.database import Database
+
+
+@pytest.fixture
+def workspace_path(tmp_path: Path) -> Path:
+    """Empty workspace directory; agents create accountant.db inside it."""
+    return tmp_path
+
+
+@pytest.fixture
+def db(workspace_path: Path):
+    """Open database in the test workspace, closed after the test."""
+    database = Database(str(workspace_path / "accountant.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def write_csv(tmp_path: Path):
+    """Write CSV lines to a file under tmp_path and return its path."""
+    def write(name: str, lines) -> str:
+        path = tmp_path / name
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return str(path)
+    return write
+
+
+def bank_txn(vendor: str, amount: float = -10.0, **fields) -> dict:
+    """Insert-ready bank transaction dict for the test database."""
+    return {
+        'date': '2024-01-15',
+        'vendor': vendor,
+        'amount': amount,
+        'source': 'bank',
+        **fields
+    }
+
+
+def rule(vendor_pattern: str, nominal_code: str, confidence: float = 0.9, **fields) -> dict:
+    """Insert-ready rule dict for the test database."""
+    return {
+        'vendor_pattern': vendor_pattern,
+        'nominal_code': nominal_code,
+        'rule_type': 'exact',
+        'confidence': confidence,
+        'created_by': 'learner',
+        **fields
+    }
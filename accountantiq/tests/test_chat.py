@@ -0,0 +1,148 @@
+"""
+Tests for the chat interface's tool-call path, with a scripted LLM client.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import chat
+from accountantiq.core.workspace import Workspace
+
+from .conftest import bank_txn
+
+
+class ScriptedOpenAI:
+    """Stands in for openai.OpenAI, streaming scripted (text, tool_calls) replies."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        self.requests.append(request)
+        text, calls = self.replies.pop(0)
+        chunks = [self._chunk(content=piece) for piece in text]
+        for index, (name, arguments) in enumerate(calls):
+            # Arguments arrive split across chunks, as the API streams them
+            arguments = json.dumps(arguments)
+            chunks.append(self._chunk(tool_call=(index, name, arguments[:5])))
+            chunks.append(self._chunk(tool_call=(index, None, arguments[5:])))
+        chunks.append(SimpleNamespace(choices=[]))
+        return iter(chunks)
+
+    @staticmethod
+    def _chunk(content=None, tool_call=None):
+        tool_calls = None
+        if tool_call is not None:
+            index, name, arguments = tool_call
+            tool_calls = [SimpleNamespace(
+                index=index, function=SimpleNamespace(name=name, arguments=arguments)
+            )]
+        delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+@pytest.fixture
+def make_chat(tmp_path, monkeypatch):
+    """Build a ChatInterface over a fresh workspace, answering from a scripted client."""
+    # ChatInterface opens accountantiq/data/workspaces/<name> under the working directory
+    monkeypatch.chdir(tmp_path)
+    workspace = Workspace("production", str(tmp_path / "accountantiq/data/workspaces")).create()
+    with workspace.get_database() as db:
+        db.insert_transactions_bulk([
+            bank_txn("Costa Coffee"), bank_txn("Costa Coffee"), bank_txn("Shell")
+        ])
+
+    interfaces = []
+
+    def make(replies):
+        client = ScriptedOpenAI(replies)
+
+        def initialize_llm(self):
+            self.llm_client = client
+            self.llm_provider = "openai"
+
+        monkeypatch.setattr(chat.ChatInterface, "_initialize_llm", initialize_llm)
+        interface = chat.ChatInterface("production")
+        interfaces.append(interface)
+        return interface, client
+
+    yield make
+    for interface in interfaces:
+        interface.db.close()
+
+
+def test_tool_call_recodes_vendor_and_creates_rule(make_chat):
+    interface, client = make_chat([
+        ([], [("update_code", {"vendor": "costa", "new_code": "7403", "explanation": "Ent"})]),
+    ])
+
+    reply = interface._process_with_llm("recode costa to 7403")
+
+    assert client.requests[0]['tools'] == chat.OPENAI_TOOLS
+    assert 'Updated 2 transactions for "Costa Coffee"' in reply
+    coded = interface.db.get_transactions(source="bank", coded=True)
+    assert {(t['vendor'], t['nominal_code'], t['assigned_by']) for t in coded} == {
+        ("Costa Coffee", "7403", "llm_chat")
+    }
+    (created,) = interface.db.get_rules()
+    assert (created['vendor_pattern'], created['nominal_code']) == ("Costa Coffee", "7403")
+    assert interface.conversation_history[-1]['content'] == reply
+
+
+def test_text_reply_is_streamed_and_recorded(make_chat):
+    interface, client = make_chat([(["3 ", "transactions."], [])])
+
+    assert interface._process_with_llm("How many transactions?") is None
+
+    # Stats go with the request, not into the kept history
+    assert "Total transactions: 3" in client.requests[0]['messages'][-1]['content']
+    assert interface.conversation_history == [
+        {"role": "user", "content": "How many transactions?"},
+        {"role": "assistant", "content": "3 transactions."},
+    ]
+
+
+def test_unknown_vendor_reports_no_match(make_chat):
+    interface, _ = make_chat([
+        ([], [("update_code", {"vendor": "nobody", "new_code": "7400"})]),
+    ])
+
+    assert interface._process_with_llm("nobody to 7400") == "No transactions found for vendor: nobody"
+    assert interface.db.get_rules() == []
+
+
+def test_repeated_question_is_answered_from_cache(make_chat):
+    interface, client = make_chat([(["3 transactions."], [])])
+
+    interface._process_with_llm("How many transactions?")
+    # Same question, same (empty) earlier conversation and data
+    interface.conversation_history.clear()
+    assert interface._process_with_llm("how many  transactions?") is None
+
+    assert len(client.requests) == 1
+    assert interface.conversation_history[-1]['content'] == "3 transactions."
+
+
+def test_cached_reply_not_reused_after_history_or_data_change(make_chat):
+    interface, client = make_chat([
+        (["3 transactions."], []),
+        (["Still 3."], []),
+        ([], [("update_code", {"vendor": "shell", "new_code": "7500"})]),
+        (["2 uncoded."], []),
+    ])
+
+    interface._process_with_llm("How many transactions?")
+    # Asked again after that exchange: the conversation differs, so the model answers
+    interface._process_with_llm("How many transactions?")
+    assert len(client.requests) == 2
+
+    interface._process_with_llm("shell to 7500")
+    interface.conversation_history.clear()
+    # Same question and history as the first turn, but the data has changed
+    interface._process_with_llm("How many transactions?")
+    assert len(client.requests) == 4
+    assert "Coded: 1" in client.requests[-1]['messages'][-1]['content']
@@ -0,0 +1,196 @@
+"""
+Tests for the classifier agent's rule matching and its match cache.
+"""
+
+import inspect
+
+import pytest
+
+from accountantiq.agents.classifier_agent import classifier_agent
+from accountantiq.agents.classifier_agent.classifier_agent import ClassifierAgent
+from accountantiq.core.database import Database
+
+from .conftest import bank_txn, rule
+
+
+def classify(workspace_path, db, **kwargs):
+    """Run the classifier and return the bank transactions by vendor."""
+    result = ClassifierAgent(str(workspace_path), db=db).run(**kwargs)
+    return result, {t['vendor']: t for t in db.get_transactions(source="bank")}
+
+
+def test_exact_and_fuzzy_matches(workspace_path, db):
+    db.insert_rules([rule("Tesco Stores", "5000", 0.9), rule("Shell Garage", "7500", 0.8)])
+    db.insert_transactions_bulk([
+        bank_txn("TESCO STORES "),   # exact after normalizing
+        bank_txn("Shell Garages"),   # fuzzy
+        bank_txn("Unknown Vendor"),  # no match
+    ])
+
+    result, txns = classify(workspace_path, db, confidence_threshold=0.7)
+
+    assert result.stats["auto_coded"] == 2
+    assert result.stats["exceptions"] == 1
+    assert txns["TESCO STORES "]['nominal_code'] == "5000"
+    assert txns["TESCO STORES "]['explanation'] == "Exact match for vendor 'tesco stores'"
+    assert txns["Shell Garages"]['nominal_code'] == "7500"
+    assert txns["Shell Garages"]['explanation'].startswith("Fuzzy match (")
+    assert txns["Unknown Vendor"]['nominal_code'] is None
+
+
+def test_low_confidence_match_is_stored_for_review(workspace_path, db):
+    db.insert_rules([rule("Amazon", "5000", 0.5)])
+    db.insert_transactions_bulk([bank_txn("Amazon")])
+
+    result, txns = classify(workspace_path, db, confidence_threshold=0.7)
+
+    assert result.stats["exceptions"] == 1
+    assert txns["Amazon"]['nominal_code'] == "5000"
+    assert txns["Amazon"]['explanation'].endswith("[NEEDS REVIEW]")
+
+
+def test_rule_stats_count_matches(workspace_path, db):
+    db.insert_rules([rule("Costa", "7400")])
+    db.insert_transactions_bulk([bank_txn("Costa"), bank_txn("costa")])
+
+    classify(workspace_path, db)
+
+    (stored,) = db.get_rules()
+    assert stored['match_count'] == 2
+
+
+def test_match_cache_is_reused_across_runs(workspace_path, db):
+    db.insert_rules([rule("Costa", "7400")])
+    db.insert_transactions_bulk([bank_txn("Costa")])
+    classify(workspace_path, db)
+
+    assert set(db.get_match_cache(["costa"])) == {"costa"}
+
+    # A later run serves the vendor from the cache, with the same result
+    db.insert_transactions_bulk([bank_txn("COSTA")])
+    _, txns = classify(workspace_path, db)
+    assert txns["COSTA"]['nominal_code'] == "7400"
+    assert txns["COSTA"]['explanation'] == txns["Costa"]['explanation']
+
+
+def test_rule_changes_invalidate_match_cache(db):
+    db.insert_rules([rule("Costa", "7400")])
+    db.upsert_match_cache([("costa", 1, 0.9, "Exact match for vendor 'costa'")])
+    assert set(db.get_match_cache(["costa"])) == {"costa"}
+
+    db.insert_rule(rule("Pret", "7400"))
+
+    assert db.get_match_cache(["costa"]) == {}
+
+
+def test_rule_stats_do_not_invalidate_match_cache(db):
+    (rule_id,) = db.insert_rules([rule("Costa", "7400")])
+    db.upsert_match_cache([("costa", rule_id, 0.9, "Exact match for vendor 'costa'")])
+
+    db.bulk_update_rule_stats({rule_id: 3})
+
+    assert set(db.get_match_cache(["costa"])) == {"costa"}
+
+
+def test_rule_edit_changes_next_classification(workspace_path, db):
+    db.insert_rules([rule("Costa", "7400")])
+    db.insert_transactions_bulk([bank_txn("Costa"), bank_txn("Pret")])
+    _, txns = classify(workspace_path, db)
+    assert (txns["Costa"]['nominal_code'], txns["Pret"]['nominal_code']) == ("7400", None)
+
+    # Rules edited in SQL, bypassing the Database rule helpers: both
+    # cached results (a match and a no-match) are now wrong
+    db.conn.execute("UPDATE rules SET vendor_pattern = 'Pret'")
+    db.insert_transactions_bulk([bank_txn("COSTA"), bank_txn("PRET")])
+    _, txns = classify(workspace_path, db)
+
+    assert txns["COSTA"]['nominal_code'] is None
+    assert txns["PRET"]['nominal_code'] == "7400"
+
+
+# Rules with repeated, near-duplicate and differently sized patterns, so
+# ties, length blocking and first-best selection all come into play
+PATH_RULES = [
+    rule("Tesco Stores", "5000", 0.9),
+    rule("tesco stores", "5001", 0.95),
+    rule("Tesco Store", "5002", 0.9),
+    rule("Shell Garage", "7500", 0.8),
+    rule("Costa Coffee", "7400", 0.85),
+    rule("Amazon", "5000", 0.65),
+    rule("Amazon Marketplace", "5000", 0.7),
+    rule("Pret A Manger", "7400", 0.75),
+    rule("BP", "7500", 0.9),
+    *(rule(f"Supplier {i:03d} Ltd", f"{6000 + i}", 0.5 + (i % 5) / 10) for i in range(40)),
+]
+
+PATH_VENDORS = [
+    "TESCO STORES", "Tesco Stores Ltd", "Tesco Stor", "Shell Garages", "Costa Cofee",
+    "Amazon", "Amazon Marketplac", "Amazon Prime Video", "Pret", "BP", "BPX",
+    "Supplier 007 Ltd", "Supplier 07 Ltd", "Supplier 123 Ltd", "Suplier 031 Ltd",
+    "A very long card payment description that matches nothing in particular",
+    "Unknown Vendor", "x",
+]
+
+MATCH_PATHS = ["sequential", "length_buckets", "cdist", "threads"]
+
+
+def force_match_path(monkeypatch, path):
+    """Set the classifier thresholds so _match_vendors takes only the given path."""
+    never = float('inf')
+    monkeypatch.setattr(classifier_agent, "CDIST_MIN_CELLS", 0 if path == "cdist" else never)
+    monkeypatch.setattr(
+        classifier_agent, "LENGTH_BLOCKING_MIN_RULES", 0 if path == "length_buckets" else never
+    )
+    monkeypatch.setattr(
+        classifier_agent, "PARALLEL_MATCH_MIN_VENDORS", 0 if path == "threads" else never
+    )
+    if path == "threads":
+        monkeypatch.setattr(classifier_agent.os, "cpu_count", lambda: 4)
+
+
+def classify_with_path(monkeypatch, db_path, path):
+    """Classify PATH_VENDORS against PATH_RULES in a fresh database via one match path."""
+    with monkeypatch.context() as patch, Database(str(db_path)) as db:
+        force_match_path(patch, path)
+        db.insert_rules(PATH_RULES)
+        db.insert_transactions_bulk([bank_txn(vendor) for vendor in PATH_VENDORS])
+        ClassifierAgent(str(db_path.parent), db=db).run(confidence_threshold=0.0)
+        return {
+            t['vendor']: (t['nominal_code'], t['confidence'], t['explanation'])
+            for t in db.get_transactions(source="bank")
+        }
+
+
+@pytest.mark.parametrize("path", MATCH_PATHS)
+def test_match_paths_agree(monkeypatch, tmp_path, path):
+    if path == "cdist":
+        pytest.importorskip("numpy")
+
+    calls = []
+    spies = {
+        "length_buckets": (ClassifierAgent, "_length_candidates"),
+        "cdist": (ClassifierAgent, "_match_vendors_cdist"),
+        "threads": (classifier_agent, "ThreadPoolExecutor"),
+    }
+    if path in spies:
+        owner, name = spies[path]
+        target = getattr(owner, name)
+
+        def spy(*args, **kwargs):
+            calls.append(name)
+            return target(*args, **kwargs)
+
+        # A staticmethod stays static, so no self is passed to it
+        is_static = isinstance(inspect.getattr_static(owner, name), staticmethod)
+        monkeypatch.setattr(owner, name, staticmethod(spy) if is_static else spy)
+
+    expected = classify_with_path(monkeypatch, tmp_path / "sequential.db", "sequential")
+    actual = classify_with_path(monkeypatch, tmp_path / f"{path}.db", path)
+
+    assert actual == expected
+    assert path == "sequential" or calls, f"{path} path was not taken"
+    # The fixture data exercises exact, fuzzy and no-match results
+    explanations = [explanation or "" for _, _, explanation in expected.values()]
+    assert any(e.startswith("Exact match") for e in explanations)
+    assert any(e.startswith("Fuzzy match") for e in explanations)
+    assert "" in explanations
@@ -0,0 +1,86 @@
+"""
+Tests for Database queries and statistics.
+"""
+
+from decimal import Decimal
+
+import duckdb
+import pytest
+
+from .conftest import bank_txn, rule
+
+
+def test_get_stats_empty(db):
+    assert db.get_stats() == {
+        'transactions': {
+            'total': 0, 'history': 0, 'bank': 0, 'reviewed': 0,
+            'coded': 0, 'avg_confidence': 0.0
+        },
+        'rules': {'total': 0, 'learned': 0, 'manual': 0, 'avg_confidence': 0.0},
+        'overrides': 0
+    }
+
+
+def test_get_stats_counts(db):
+    db.insert_transactions_bulk([
+        bank_txn("Costa", nominal_code="7400", confidence=0.9),
+        bank_txn("Pret", confidence=0.5),
+        bank_txn("Tesco", source="history", nominal_code="5000", confidence=1.0),
+    ])
+    db.insert_rules([
+        rule("Costa", "7400", 0.9),
+        rule("Tesco", "5000", 0.8, created_by="reviewer"),
+    ])
+    txn_id = db.get_transactions(source="bank", coded=True)[0]['id']
+    db.update_transaction(txn_id, {'reviewed': True})
+    db.insert_override({'transaction_id': txn_id, 'original_code': None, 'corrected_code': '7400'})
+
+    stats = db.get_stats()
+
+    assert stats['transactions'] == {
+        'total': 3, 'history': 1, 'bank': 2, 'reviewed': 1,
+        'coded': 2, 'avg_confidence': 0.8
+    }
+    assert stats['rules'] == {'total': 2, 'learned': 1, 'manual': 1, 'avg_confidence': 0.85}
+    assert stats['overrides'] == 1
+
+
+def test_transaction_filters(db):
+    db.insert_transactions_bulk([
+        bank_txn("Costa", nominal_code="7400", confidence=0.9),
+        bank_txn("Pret", nominal_code="  ", confidence=0.69),
+        bank_txn("Tesco"),
+    ])
+
+    assert db.count_transactions(coded=True) == 1
+    assert db.count_transactions(coded=False) == 2
+    assert db.count_transactions(min_confidence=0.9) == 1
+    assert {t['vendor'] for t in db.get_transactions(needs_review_below=0.7)} == {"Pret", "Tesco"}
+    assert [t['vendor'] for t in db.find_transactions_by_vendor("OST")] == ["Costa"]
+
+
+def test_bulk_insert_keeps_amounts_exact(db):
+    # Decimals (as the parsers produce) and plain numbers are both accepted
+    db.insert_transactions_bulk([
+        bank_txn("A", amount=Decimal('12345678.91')),
+        bank_txn("B", amount=Decimal('0.30')),
+        bank_txn("C", amount=-7),
+    ])
+
+    amounts = {t['vendor']: t['amount'] for t in db.get_transactions()}
+    assert amounts == {'A': Decimal('12345678.91'), 'B': Decimal('0.30'), 'C': Decimal('-7.00')}
+    assert db.conn.execute("SELECT SUM(amount) FROM transactions").fetchone()[0] == Decimal('12345672.21')
+
+
+def test_bulk_insert_rounds_and_range_checks_like_duckdb(db):
+    # DuckDB rounds half away from zero when narrowing to DECIMAL(10,2)
+    db.insert_transactions_bulk([
+        bank_txn("A", amount=Decimal('12.345')),
+        bank_txn("B", amount=12.345),
+        bank_txn("C", amount=Decimal('-0.005')),
+    ])
+    amounts = {t['vendor']: t['amount'] for t in db.get_transactions()}
+    assert amounts == {'A': Decimal('12.35'), 'B': Decimal('12.35'), 'C': Decimal('-0.01')}
+
+    with pytest.raises(duckdb.ConversionException, match="out of range"):
+        db.insert_transactions_bulk([bank_txn("D", amount=Decimal('123456789.12'))])
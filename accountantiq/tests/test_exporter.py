@@ -0,0 +1,43 @@
+"""
+Tests for the Sage 50 exporter.
+"""
+
+import csv
+from datetime import date
+
+from accountantiq.agents.exporter_agent.exporter_agent import ExporterAgent
+
+from .conftest import bank_txn
+
+
+def test_export_writes_sage_rows(workspace_path, db):
+    db.insert_transactions_bulk([
+        bank_txn("Costa", amount=-3.5, date='2024-02-09', nominal_code="7400", reference="R1"),
+        bank_txn("=HYPERLINK()", amount=120, date='2024-12-31', nominal_code="4000"),
+        bank_txn("Uncoded", amount=-1),
+    ])
+    (workspace_path / "exports").mkdir()
+
+    result = ExporterAgent(str(workspace_path), db=db).run("out.csv")
+
+    assert result.status == "complete"
+    with open(result.stats["output_file"], newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['Date', 'Type', 'Nominal Code', 'Reference', 'Details', 'Debit', 'Credit']
+    assert sorted(rows[1:]) == [
+        ['09/02/2024', 'BP', '7400', 'R1', 'Costa', '0.00', '3.50'],
+        ['31/12/2024', 'BR', '4000', '', "'=HYPERLINK()", '120.00', '0.00'],
+    ]
+
+
+def test_sage_rows_format_dates_and_iso_strings(tmp_path):
+    exporter = ExporterAgent(str(tmp_path))
+    txns = [
+        {'date': date(2024, 3, 1), 'amount': -1, 'nominal_code': '7400', 'vendor': 'A'},
+        {'date': '2024-03-02', 'amount': -1, 'nominal_code': '7400', 'vendor': 'B'},
+        {'date': '02/03/2024', 'amount': -1, 'nominal_code': '7400', 'vendor': 'C'},
+    ]
+
+    assert [row[0] for row in exporter._sage50_rows(txns)] == [
+        '01/03/2024', '02/03/2024', '02/03/2024'
+    ]
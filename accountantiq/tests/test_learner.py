@@ -0,0 +1,40 @@
+"""
+Tests for the learner agent's pattern analysis.
+"""
+
+import pytest
+
+from accountantiq.agents.learner_agent import learner_agent
+from accountantiq.agents.learner_agent.learner_agent import LearnerAgent
+
+from .conftest import bank_txn
+
+
+@pytest.mark.parametrize("min_rows", [1, 10_000], ids=["vectorized", "loop"])
+def test_learn_patterns(workspace_path, db, monkeypatch, min_rows):
+    monkeypatch.setattr(learner_agent, "VECTORIZED_ANALYSIS_MIN_ROWS", min_rows)
+
+    def history(vendor, code):
+        return bank_txn(vendor, source="history", nominal_code=code)
+
+    # History is read back newest first (id DESC), so the last row here is seen first
+    db.insert_transactions_bulk([
+        history("Uncoded", None), history("Blank", ""),
+        history("Tesco", "7300"), history("Tesco", "5000"),
+        history("COSTA", "7400"), history("costa", "7900"),
+        history("Costa", "7400"), history("Costa ", "7400"),
+    ])
+
+    agent = LearnerAgent(str(workspace_path), db=db)
+    mappings = agent._analyze_patterns(db.get_transactions_df(source="history"))
+
+    assert list(mappings) == ["costa", "tesco"]
+    assert mappings["costa"] == {'nominal_code': "7400", 'count': 3, 'confidence': 0.75}
+    # A tie goes to the code seen first
+    assert mappings["tesco"] == {'nominal_code': "5000", 'count': 1, 'confidence': 0.5}
+
+    result = agent.run(min_confidence=0.75, smart_matching=False)
+
+    assert result.stats["historical_transactions"] == 8
+    assert result.stats["basic_rules"] == 1
+    assert [(r['vendor_pattern'], r['nominal_code']) for r in db.get_rules()] == [("costa", "7400")]
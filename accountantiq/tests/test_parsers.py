@@ -0,0 +1,87 @@
+"""
+Tests for the Sage and bank CSV parsers.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from accountantiq.agents.parser_agent.bank_parser import BankParser
+from accountantiq.agents.parser_agent.sage_parser import SageParser
+from accountantiq.agents.parser_agent.parser_agent import ParserAgent
+from accountantiq.core.models import Transaction
+
+
+def test_sage_parser_filters_and_dedups(write_csv):
+    path = write_csv("sage.csv", [
+        '0,BP,7100,19/02/2024,R0,230.31,,,,,,,,,Apple.Com/Bill',
+        # Same transaction repeated in the audit trail
+        '0,BP,7100,19/02/2024,R0,230.31,,,,,,,,,Apple.Com/Bill',
+        # Debit minus credit, with padded reference and vendor
+        '1,BP,0030,1/2/2024, R1 ,100.10,50.05,,,,,,,, Dell',
+        # No nominal code (all zeros or blank)
+        '2,BP,0,01/02/2024,R2,5,,,,,,,,,X',
+        '3,BP,,01/02/2024,R2,5,,,,,,,,,X',
+        # Sub-penny amount
+        '4,BP,7200,01/02/2024,,0.3,0.1001,,,,,,,,V',
+        # Zero amount and bad date
+        '5,BP,7200,01/02/2024,,5,5,,,,,,,,V',
+        '6,BP,7200,31/02/2024,,5,,,,,,,,,V',
+    ])
+
+    records = SageParser(None).parse_records(path)
+
+    assert [(r['vendor'], r['nominal_code'], r['amount'], r['date']) for r in records] == [
+        ('Apple.Com/Bill', '7100', Decimal('230.31'), '2024-02-19'),
+        ('Dell', '0030', Decimal('50.05'), '2024-02-01'),
+    ]
+    assert records[1]['details'] == 'BP: Dell (Ref: R1)'
+    assert all(r['source'] == 'history' and r['confidence'] == 1.0 for r in records)
+
+
+def test_sage_parser_matches_model_validation(write_csv):
+    path = write_csv("sage.csv", [
+        '1,BP,7100,19/02/2024,R0,12.34,,,,,,,,,Vendor A',
+        '2,BR,4000,20/02/2024,,,99.99,,,,,,,,',
+    ])
+
+    parsed = SageParser(None).parse(path)
+
+    assert [t.vendor for t in parsed] == ['Vendor A', 'Unknown']
+    assert [t.amount for t in parsed] == [Decimal('12.34'), Decimal('-99.99')]
+    assert all(isinstance(t, Transaction) for t in parsed)
+
+
+def test_bank_parser_extracts_vendors_and_drops_bad_rows(write_csv):
+    path = write_csv("bank.csv", [
+        '20240105,,,,DR,,Transfer,"-1,250.00","FPS, Gbp Faster Payment, Landlord Ltd, x",RENT',
+        ' 20240106 ,,,,DR,, Card ," -12.5 ","  Card 44,   Tesco   Extra  ",',
+        # Blank amount, bad dates and a sub-penny amount are dropped
+        '20240107,,,,DR,,Card,,"Card 44, Tesco",R',
+        'bad,,,,DR,,Card,-3,"Card 44, Tesco",R',
+        '20241340,,,,DR,,Card,-3,"Card 44, Tesco",R',
+        '20240108,,,,DR,,Card,-0.005,"Card 44, Tesco",R',
+    ])
+
+    records = BankParser(None).parse_records(path)
+
+    assert [(r['date'], r['vendor'], r['amount']) for r in records] == [
+        ('2024-01-05', 'Landlord Ltd', Decimal('-1250')),
+        ('2024-01-06', 'Tesco Extra', Decimal('-12.5')),
+    ]
+    assert all(r['source'] == 'bank' and r['nominal_code'] is None for r in records)
+
+
+def test_parser_agent_inserts_parsed_rows(workspace_path, db, write_csv):
+    path = write_csv("sage.csv", [
+        '1,BP,7100,19/02/2024,R0,12.34,,,,,,,,,Vendor A',
+        '1,BP,7100,19/02/2024,R0,12.34,,,,,,,,,Vendor A',
+    ])
+
+    result = ParserAgent(str(workspace_path), db=db).run(path, "sage")
+
+    assert result.status == "complete"
+    assert result.stats["rows_inserted"] == 1
+    (txn,) = db.get_transactions()
+    assert txn['date'] == date(2024, 2, 19)
+    assert txn['amount'] == Decimal('12.34')
+
@@ -0,0 +1,61 @@
+"""
+Tests for reviewer overrides and suggestions.
+"""
+
+from accountantiq.agents.reviewer_agent.ai_suggester import AISuggester
+from accountantiq.agents.reviewer_agent.reviewer_agent import ReviewerAgent
+
+from .conftest import bank_txn
+
+
+def test_override_recodes_and_creates_rule(workspace_path, db):
+    db.insert_transactions_bulk([bank_txn("Costa", nominal_code="7900")])
+    (txn,) = db.get_transactions()
+
+    rule_id = ReviewerAgent(str(workspace_path), db=db).handle_override(txn['id'], "7400")
+
+    (updated,) = db.get_transactions()
+    assert updated['nominal_code'] == "7400"
+    assert updated['reviewed'] is True
+    assert updated['assigned_by'] == "reviewer"
+    assert updated['explanation'] == "User override from 7900 to 7400"
+
+    (created,) = db.get_rules()
+    assert created['id'] == rule_id
+    assert (created['vendor_pattern'], created['nominal_code'], created['created_by']) == (
+        "Costa", "7400", "reviewer"
+    )
+
+    (override,) = db.conn.execute(
+        "SELECT transaction_id, original_code, corrected_code, created_rule_id FROM overrides"
+    ).fetchall()
+    assert override == (txn['id'], "7900", "7400", rule_id)
+
+
+def test_overrides_chain_and_skip_missing_transactions(workspace_path, db):
+    db.insert_transactions_bulk([bank_txn("Costa", nominal_code="7900")])
+    (txn,) = db.get_transactions()
+
+    rule_ids = ReviewerAgent(str(workspace_path), db=db).handle_overrides(
+        [(txn['id'], "7400"), (txn['id'] + 1, "5000"), (txn['id'], "7401")],
+        create_rule=False
+    )
+
+    assert rule_ids == [None, None, None]
+    assert db.get_rules() == []
+    assert db.get_transactions()[0]['nominal_code'] == "7401"
+
+    # The second correction records the first one as its original code
+    overrides = db.conn.execute(
+        "SELECT original_code, corrected_code FROM overrides ORDER BY id"
+    ).fetchall()
+    assert overrides == [("7900", "7400"), ("7400", "7401")]
+
+
+def test_codes_context_follows_in_place_changes():
+    suggester = AISuggester()
+    codes = {"7400": "Travel"}
+    assert "7400: Travel" in suggester._codes_context(codes)
+
+    codes["7100"] = "IT"
+    assert "7100: IT" in suggester._codes_context(codes)
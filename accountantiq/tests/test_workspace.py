@@ -0,0 +1,41 @@
+"""
+Tests for workspace lifecycle and config.
+"""
+
+import shutil
+
+import pytest
+
+from accountantiq.core.workspace import Workspace
+
+
+def test_get_database_after_external_delete(tmp_path):
+    workspace = Workspace("acme", str(tmp_path)).create()
+    assert workspace.exists()
+
+    # Removed behind this instance's back (another process, or by hand)
+    shutil.rmtree(workspace.workspace_path)
+
+    assert not workspace.exists()
+    with pytest.raises(ValueError, match="does not exist"):
+        workspace.get_database()
+    assert not workspace.db_file.exists()
+
+
+def test_config_changes_only_stick_when_saved(tmp_path, monkeypatch):
+    workspace = Workspace("acme", str(tmp_path)).create()
+
+    # Editing a returned config doesn't leak into later reads
+    workspace.get_config().sage_columns = {"date": 3}
+    assert workspace.get_config().sage_columns is None
+
+    workspace.update_config(sage_columns={"date": 3})
+    assert workspace.get_config().sage_columns == {"date": 3}
+
+    # A failed write leaves the cached config matching the file
+    def fail(path, data):
+        raise OSError("disk full")
+    monkeypatch.setattr(type(workspace.config_file), "write_bytes", fail)
+    with pytest.raises(OSError):
+        workspace.update_config(bank_columns={"amount": 7})
+    assert workspace.get_config().bank_columns is None
@@ -8,30 +8,111 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich import box
+from rapidfuzz import fuzz, process, utils
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 import os
 import json
 
-from accountantiq.core.workspace import Workspace
-
 console = Console()
 
+# Vendors named (or nearly named) in a question are listed for the model
+RELEVANT_VENDOR_LIMIT = 20
+RELEVANT_VENDOR_MIN_SCORE = 85
+
+# Earlier messages sent with each request (user/assistant pairs)
+MAX_HISTORY_MESSAGES = 20
+
+# Kept free of per-turn data so it forms a stable, cacheable prompt prefix
+SYSTEM_PROMPT = """You are an AI assistant for AccountantIQ, an automated bookkeeping system.
+
+Each user message starts with the current workspace stats, followed by any
+vendors the message seems to mention with their transaction counts and usual codes.
+
+You help users manage their accounting data through natural language.
+
+When the user asks to change/update/recode transactions, call the update_code tool.
+
+When asked about data, query the database and respond naturally.
+
+Common UK nominal codes:
+- 1210: Bank Account
+- 5000: Purchases
+- 7100: IT & Software
+- 7103: Accountancy
+- 7104: Insurance
+- 7200: Utilities/General
+- 7300: Office Supplies
+- 7400: Travel & Subsistence
+- 7403: Entertainment
+- 7500: Motor Expenses
+- 7600: Professional Fees
+- 7901: Bank Charges
+
+Be helpful, concise, and execute actions when requested."""
+
+
+# Actions the model can take, described once as a JSON schema; the
+# provider SDKs hand back the arguments already parsed
+UPDATE_CODE_TOOL = {
+    "name": "update_code",
+    "description": (
+        "Recode every bank transaction whose vendor contains the given text, "
+        "and save a rule so future transactions from that vendor get the same code."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "vendor": {"type": "string", "description": "Vendor name, or part of it"},
+            "new_code": {"type": "string", "description": "Nominal code to assign, e.g. 7403"},
+            "explanation": {"type": "string", "description": "Short description of the new code"}
+        },
+        "required": ["vendor", "new_code"]
+    }
+}
+
+OPENAI_TOOLS = [{"type": "function", "function": UPDATE_CODE_TOOL}]
+ANTHROPIC_TOOLS = [{
+    "name": UPDATE_CODE_TOOL["name"],
+    "description": UPDATE_CODE_TOOL["description"],
+    "input_schema": UPDATE_CODE_TOOL["parameters"]
+}]
+
 
 class ChatInterface:
     """Natural language chat interface for accounting operations."""
 
     def __init__(self, workspace_name: str = "production"):
         """Initialize chat interface."""
+        self.llm_client = None
+        self.conversation_history = []
+
+        # Initialize LLM first, so a missing API key exits before the
+        # workspace and database stack is loaded
+        self._initialize_llm()
+
+        # Imported here: it pulls in DuckDB, Polars and the models
+        from accountantiq.core.workspace import Workspace
+
         self.workspace = Workspace(
             workspace_name,
             str(Path("accountantiq/data/workspaces").absolute())
         )
         self.db = self.workspace.get_database()
-        self.llm_client = None
-        self.conversation_history = []
 
-        # Initialize LLM
-        self._initialize_llm()
+        # Workspace stats for the system prompt; recomputed only after
+        # an action changes transactions
+        self._stats_cache = None
+        self._stats_dirty = True
+
+        # Plain (non-action) replies, keyed on everything the model saw
+        # (see _process_with_llm); cleared whenever the stats are
+        # recomputed, i.e. after data changes
+        self._response_cache: Dict[tuple, str] = {}
+
+        # Per-vendor counts and usual codes, loaded on first use and
+        # dropped with the response cache
+        self._vendor_summary: Optional[List[Dict]] = None
 
     def _initialize_llm(self):
         """Initialize LLM client."""
@@ -78,11 +159,12 @@ class ChatInterface:
                 self._show_help()
                 continue
 
-            # Process with LLM
+            # Process with LLM; plain replies are printed as they stream in
+            console.print("\n[bold yellow]Assistant[/bold yellow]: ", end="")
             response = self._process_with_llm(user_input)
 
-            # Display response
-            console.print(f"\n[bold yellow]Assistant[/bold yellow]: {response}\n")
+            # Display anything that wasn't streamed (action results, errors)
+            console.print(f"{response}\n" if response is not None else "\n")
 
         self.db.close()
 
@@ -141,144 +223,199 @@ Type 'help' for more examples, 'quit' to exit.
         """
         console.print(Panel(help_text, box=box.ROUNDED, border_style="yellow"))
 
-    def _process_with_llm(self, user_input: str) -> str:
-        """Process user input with LLM and execute actions."""
-
-        # Get current stats for context
-        bank_txns = self.db.get_transactions(source="bank")
-        coded = [t for t in bank_txns if t.get('nominal_code')]
-        uncoded = [t for t in bank_txns if not t.get('nominal_code')]
-
-        context = {
-            "total_transactions": len(bank_txns),
-            "coded": len(coded),
-            "uncoded": len(uncoded),
-            "coverage_percent": round(len(coded) / len(bank_txns) * 100, 1)
-        }
-
-        # Build system prompt
-        system_prompt = f"""You are an AI assistant for AccountantIQ, an automated bookkeeping system.
+    def _process_with_llm(self, user_input: str) -> Optional[str]:
+        """Process user input with LLM and execute actions (None if the reply was streamed)."""
+
+        # Static instructions go first and stay byte-identical between turns
+        # so providers can reuse the cached prefix; the changing stats ride
+        # on the newest user message only
+        context = self._get_context()
+
+        # A repeated question gets the earlier answer only if the model
+        # would see the same thing again: the same earlier messages (a
+        # follow-up depends on them) and the same coded/uncoded counts
+        cache_key = (
+            " ".join(user_input.lower().split()),
+            hash(tuple(message["content"] for message in self.conversation_history)),
+            context['coded'],
+            context['uncoded']
+        )
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._record_exchange(user_input, cached)
+            console.print(cached, end="", markup=False, highlight=False)
+            return None
 
-Current workspace stats:
+        turn = f"""Current workspace stats:
 - Total transactions: {context['total_transactions']}
 - Coded: {context['coded']} ({context['coverage_percent']}%)
 - Uncoded: {context['uncoded']}
+{self._relevant_vendors_block(user_input)}
+{user_input}"""
+        messages = self.conversation_history + [{"role": "user", "content": turn}]
 
-You help users manage their accounting data through natural language.
-
-When the user asks to change/update/recode transactions, respond with a JSON action:
-{{
-  "action": "update_code",
-  "vendor": "vendor name",
-  "new_code": "7403",
-  "explanation": "Updated to Entertainment"
-}}
-
-When asked about data, query the database and respond naturally.
-
-Common UK nominal codes:
-- 1210: Bank Account
-- 5000: Purchases
-- 7100: IT & Software
-- 7103: Accountancy
-- 7104: Insurance
-- 7200: Utilities/General
-- 7300: Office Supplies
-- 7400: Travel & Subsistence
-- 7403: Entertainment
-- 7500: Motor Expenses
-- 7600: Professional Fees
-- 7901: Bank Charges
-
-Be helpful, concise, and execute actions when requested."""
-
-        # Call LLM
+        # Call LLM, streaming the reply; actions arrive as tool calls
         try:
             if self.llm_provider == "openai":
-                response = self.llm_client.chat.completions.create(
+                stream = self.llm_client.chat.completions.create(
                     model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_input}
-                    ],
-                    temperature=0.3
+                    messages=[{"role": "system", "content": SYSTEM_PROMPT}] + messages,
+                    tools=OPENAI_TOOLS,
+                    temperature=0.3,
+                    stream=True
                 )
-                llm_response = response.choices[0].message.content
+                tool_calls: Dict[int, Dict[str, str]] = {}
+                llm_response = self._stream_reply(self._openai_text_deltas(stream, tool_calls))
+                actions = [
+                    (call["name"], json.loads(call["arguments"] or "{}"))
+                    for _, call in sorted(tool_calls.items())
+                ]
 
             elif self.llm_provider == "anthropic":
-                response = self.llm_client.messages.create(
+                with self.llm_client.messages.stream(
                     model="claude-3-5-sonnet-20241022",
                     max_tokens=1024,
                     temperature=0.3,
-                    system=system_prompt,
-                    messages=[
-                        {"role": "user", "content": user_input}
-                    ]
+                    system=[{
+                        "type": "text",
+                        "text": SYSTEM_PROMPT,
+                        "cache_control": {"type": "ephemeral"}
+                    }],
+                    tools=ANTHROPIC_TOOLS,
+                    messages=messages
+                ) as stream:
+                    llm_response = self._stream_reply(stream.text_stream)
+                    final_message = stream.get_final_message()
+                actions = [
+                    (block.name, block.input)
+                    for block in final_message.content if block.type == "tool_use"
+                ]
+
+            if actions:
+                action_result = "\n\n".join(
+                    self._execute_action(name, args) for name, args in actions
                 )
-                llm_response = response.content[0].text
+                self._record_exchange(user_input, f"{llm_response}\n\n{action_result}".strip())
+                # Any streamed text is left on its own line
+                return f"\n{action_result}" if llm_response else action_result
 
-            # Check if LLM returned a JSON action
-            if "```json" in llm_response or llm_response.strip().startswith("{"):
-                action_result = self._execute_action(llm_response)
-                return action_result
-
-            return llm_response
+            # Actions are never cached, so a repeat request runs again
+            if llm_response:
+                self._record_exchange(user_input, llm_response)
+                self._response_cache[cache_key] = llm_response
+            return None
 
         except Exception as e:
             return f"[red]Error: {e}[/red]"
 
-    def _execute_action(self, llm_response: str) -> str:
-        """Execute action from LLM response."""
+    def _record_exchange(self, user_input: str, reply: str):
+        """Keep an exchange (without the stats) for follow-up questions."""
+        self.conversation_history.append({"role": "user", "content": user_input})
+        self.conversation_history.append({"role": "assistant", "content": reply})
+        del self.conversation_history[:-MAX_HISTORY_MESSAGES]
+
+    @staticmethod
+    def _openai_text_deltas(stream, tool_calls: Dict[int, Dict[str, str]]) -> Iterator[str]:
+        """Yield text from an OpenAI stream, collecting tool call fragments into tool_calls."""
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            for call in delta.tool_calls or []:
+                entry = tool_calls.setdefault(call.index, {"name": "", "arguments": ""})
+                if call.function is not None:
+                    entry["name"] += call.function.name or ""
+                    entry["arguments"] += call.function.arguments or ""
+            if delta.content:
+                yield delta.content
+
+    def _stream_reply(self, deltas: Iterable[str]) -> str:
+        """Print reply text as it arrives and return the full reply."""
+        parts = []
+        for delta in deltas:
+            parts.append(delta)
+            console.print(delta, end="", markup=False, highlight=False)
+        return "".join(parts)
+
+    def _get_context(self) -> dict:
+        """Bank transaction stats sent with each turn (cached until data changes)."""
+        if self._stats_dirty or self._stats_cache is None:
+            # Counted in DuckDB rather than loading every row into Python
+            total = self.db.count_transactions(source="bank")
+            coded = self.db.count_transactions(source="bank", coded=True)
+            self._stats_cache = {
+                "total_transactions": total,
+                "coded": coded,
+                "uncoded": total - coded,
+                "coverage_percent": round(coded / total * 100, 1) if total else 0.0
+            }
+            self._stats_dirty = False
+            self._response_cache.clear()
+            self._vendor_summary = None
+        return self._stats_cache
+
+    def _relevant_vendors_block(self, user_input: str) -> str:
+        """Prompt lines describing vendors the question seems to mention ("" if none)."""
+        if self._vendor_summary is None:
+            self._vendor_summary = self.db.get_vendor_summary(source="bank")
+
+        # Same RapidFuzz matching the classifier uses, against distinct vendors
+        matches = process.extract(
+            user_input,
+            [v['vendor'] for v in self._vendor_summary],
+            scorer=fuzz.WRatio,
+            processor=utils.default_process,
+            limit=RELEVANT_VENDOR_LIMIT,
+            score_cutoff=RELEVANT_VENDOR_MIN_SCORE
+        )
+        if not matches:
+            return ""
+
+        lines = ["", "Relevant vendors (transactions, usual code):"]
+        for _, _, idx in matches:
+            vendor = self._vendor_summary[idx]
+            lines.append(
+                f"- {vendor['vendor']}: {vendor['transactions']}, "
+                f"{vendor['nominal_code'] or 'uncoded'}"
+            )
+        return "\n".join(lines) + "\n"
 
-        # Extract JSON
-        try:
-            # Handle markdown code blocks
-            if "```json" in llm_response:
-                json_str = llm_response.split("```json")[1].split("```")[0].strip()
-            elif "```" in llm_response:
-                json_str = llm_response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = llm_response.strip()
-
-            action = json.loads(json_str)
-        except:
-            return llm_response  # Not a JSON action, return as-is
-
-        # Execute action
-        if action.get("action") == "update_code":
-            vendor = action.get("vendor")
-            new_code = action.get("new_code")
-            explanation = action.get("explanation", "")
-
-            # Find transactions
-            bank_txns = self.db.get_transactions(source="bank")
-            matching = [t for t in bank_txns if vendor.lower() in t['vendor'].lower()]
+    def _execute_action(self, name: str, args: Dict[str, Any]) -> str:
+        """Execute a tool call from the LLM."""
+        if name == "update_code":
+            vendor = args.get("vendor")
+            new_code = args.get("new_code")
+            explanation = args.get("explanation", "")
+
+            # Find transactions (matched in DuckDB, not by loading every row)
+            matching = self.db.find_transactions_by_vendor(vendor, source="bank")
 
             if not matching:
                 return f"No transactions found for vendor: {vendor}"
 
-            # Update transactions
-            for txn in matching:
-                self.db.update_transaction(txn['id'], {
+            # Update transactions and replace the vendor's rule together
+            with self.db.transaction():
+                self.db.update_transactions([txn['id'] for txn in matching], {
                     'nominal_code': new_code,
                     'confidence': 1.0,
                     'assigned_by': 'llm_chat',
                     'reviewed': True
                 })
+                self._stats_dirty = True
 
-            # Update/create rule
-            self.db.conn.execute(
-                "DELETE FROM rules WHERE vendor_pattern = ?",
-                [matching[0]['vendor']]
-            )
+                # Update/create rule
+                self.db.conn.execute(
+                    "DELETE FROM rules WHERE vendor_pattern = ?",
+                    [matching[0]['vendor']]
+                )
 
-            rule_id = self.db.insert_rule({
-                'vendor_pattern': matching[0]['vendor'],
-                'nominal_code': new_code,
-                'rule_type': 'exact',
-                'confidence': 1.0,
-                'created_by': 'reviewer'
-            })
+                rule_id = self.db.insert_rule({
+                    'vendor_pattern': matching[0]['vendor'],
+                    'nominal_code': new_code,
+                    'rule_type': 'exact',
+                    'confidence': 1.0,
+                    'created_by': 'reviewer'
+                })
 
             result = f"""✓ Updated {len(matching)} transactions for "{matching[0]['vendor']}"
 ✓ Changed to {new_code} ({explanation})
@@ -1,21 +1,39 @@
 from accountantiq.core.workspace import Workspace
 from pathlib import Path
-from collections import Counter
 
 workspace = Workspace("production", str(Path("accountantiq/data/workspaces").absolute()))
 db = workspace.get_database()
 
-# Get all bank transactions
-bank_txns = db.get_transactions(source="bank")
-total = len(bank_txns)
+# Counts and breakdowns are aggregated in DuckDB; no transaction rows are
+# loaded into Python. Blank or whitespace-only codes count as uncoded.
+CODED = "nominal_code IS NOT NULL AND TRIM(nominal_code) != ''"
+UNCODED = "nominal_code IS NULL OR TRIM(nominal_code) = ''"
+MANUAL_CODED = f"({CODED}) AND assigned_by = 'manual_review'"
 
-# Split coded vs uncoded
-coded = [t for t in bank_txns if t.get('nominal_code') and t.get('nominal_code').strip()]
-uncoded = [t for t in bank_txns if not t.get('nominal_code') or not t.get('nominal_code').strip()]
 
-# Get rules
-all_rules = db.get_rules()
-manual_rules = [r for r in all_rules if r.get('created_by') == 'reviewer']
+def bank_counts_by(column, where, limit=None):
+    """(value, count) pairs for bank transactions matching where, most common first."""
+    query = f"""
+        SELECT {column}, COUNT(*) AS n
+        FROM transactions
+        WHERE source = 'bank' AND ({where})
+        GROUP BY {column}
+        ORDER BY n DESC, {column}
+    """
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return db.conn.execute(query).fetchall()
+
+
+# Coverage of bank transactions
+total = db.count_transactions(source="bank")
+coded = db.count_transactions(source="bank", coded=True)
+uncoded = total - coded
+
+# Rules
+total_rules, manual_rules = db.conn.execute(
+    "SELECT COUNT(*), COUNT(*) FILTER (WHERE created_by = 'reviewer') FROM rules"
+).fetchone()
 
 print("=" * 80)
 print("PROGRESS UPDATE")
@@ -23,50 +41,47 @@ print("=" * 80)
 
 print(f"\n📊 COVERAGE:")
 print(f"   Total transactions:     {total}")
-print(f"   Coded:                  {len(coded)} ({len(coded)/total*100:.1f}%)")
-print(f"   Uncoded:                {len(uncoded)} ({len(uncoded)/total*100:.1f}%)")
+print(f"   Coded:                  {coded} ({coded/total*100:.1f}%)")
+print(f"   Uncoded:                {uncoded} ({uncoded/total*100:.1f}%)")
 
-improvement = len(coded) - 1213
+improvement = coded - 1213
 print(f"\n   Improvement:            +{improvement} transactions since auto-coding")
 
 print(f"\n🎯 RULES:")
-print(f"   Total rules:            {len(all_rules)}")
-print(f"   Manual rules created:   {len(manual_rules)}")
+print(f"   Total rules:            {total_rules}")
+print(f"   Manual rules created:   {manual_rules}")
 
 # Show what was manually coded
 if improvement > 0:
     print(f"\n✅ RECENTLY CODED TRANSACTIONS:")
-    
-    # Get manually coded transactions
-    manual_coded = [t for t in coded if t.get('assigned_by') == 'manual_review']
-    
-    if manual_coded:
-        # Group by nominal code
-        by_code = Counter(t['nominal_code'] for t in manual_coded)
-        
-        print(f"   Total manually coded:   {len(manual_coded)}")
+
+    # Manually coded transactions, grouped by nominal code
+    by_code = bank_counts_by("nominal_code", MANUAL_CODED)
+
+    if by_code:
+        print(f"   Total manually coded:   {sum(count for _, count in by_code)}")
         print(f"\n   Breakdown by code:")
-        for code, count in sorted(by_code.items(), key=lambda x: x[1], reverse=True):
+        for code, count in by_code:
             print(f"      {code}: {count} transactions")
-        
+
         # Show vendor breakdown
         print(f"\n   Vendors coded:")
-        vendor_counts = Counter(t['vendor'] for t in manual_coded)
-        for vendor, count in sorted(vendor_counts.items(), key=lambda x: x[1], reverse=True)[:15]:
+        for vendor, count in bank_counts_by("vendor", MANUAL_CODED, limit=15):
             vendor_short = vendor[:50]
             print(f"      {count:3d}  {vendor_short}")
 
 # Show remaining exceptions by vendor
-print(f"\n📋 REMAINING EXCEPTIONS ({len(uncoded)}):")
+print(f"\n📋 REMAINING EXCEPTIONS ({uncoded}):")
 if uncoded:
-    vendor_counts = Counter(t['vendor'] for t in uncoded)
     print(f"   Top 10 uncoded vendors:")
-    for vendor, count in vendor_counts.most_common(10):
+    for vendor, count in bank_counts_by("vendor", UNCODED, limit=10):
         vendor_short = vendor[:50]
         print(f"      {count:3d}  {vendor_short}")
 
 # Calculate time estimate
-remaining_vendors = len(set(t['vendor'] for t in uncoded))
+remaining_vendors = db.conn.execute(
+    f"SELECT COUNT(DISTINCT vendor) FROM transactions WHERE source = 'bank' AND ({UNCODED})"
+).fetchone()[0]
 estimated_minutes = (remaining_vendors * 20) / 60  # 20 sec per vendor
 
 print(f"\n⏱️  ESTIMATE:")